@@ -0,0 +1,16 @@
+"""
+Agent package. Agent and ChatAgent are re-exported lazily so importing a
+submodule (e.g. the video renderer) does not pull in the LLM stack.
+"""
+
+__all__ = ["Agent", "ChatAgent"]
+
+
+def __getattr__(name):
+    if name == "Agent":
+        from app.agent.agent import Agent
+        return Agent
+    if name == "ChatAgent":
+        from app.agent.chat_agent import ChatAgent
+        return ChatAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
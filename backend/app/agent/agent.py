@@ -4,67 +4,36 @@ Generic ReAct agent for querying and analyzing codebase vector stores.
 Uses LlamaIndex's ReAct agent framework for enhanced reasoning and transparency.
 """
 
-from typing import Dict, Optional
+import logging
+from typing import AsyncIterator, ClassVar
 from llama_index.core.agent.workflow import ReActAgent
-from llama_index.llms.openai import OpenAI
-from llama_index.core.callbacks import CallbackManager, LlamaDebugHandler
 from llama_index.core.workflow import Context
 from llama_index.core.memory import Memory
-import app.agent.agent_tools as agent_tools
-import app.agent.agent_helpers as agent_helpers
+from app.agent import agent_helpers, agent_tools
+from app.agent.latency import latency_tracker
 import app.constants as constants
 
+logger = logging.getLogger(__name__)
+
 
 class Agent:
     """Generic agent for querying and analyzing codebase vector stores."""
-    
-    def __init__(self, username: str, model: str = "gpt-5-mini", temperature: float = 0.1):
-        self.index_name = f"{username}-user-database"
-
-        # Set up debug handler for detailed logging
-        llama_debug = LlamaDebugHandler(print_trace_on_end=True)
-        callback_manager = CallbackManager([llama_debug])
-
-        # Initialize OpenAI LLM for ReAct agent compatibility
-        self.llm = OpenAI(
-            model=model,
-            api_key=constants.OPENAI_API_KEY,
-            temperature=temperature,
-            callback_manager=callback_manager,
-        )
-
-        # Create tools and agent
-        self.tools = agent_tools.create_agent_tools(self.index_name)
-
-        # Create ReAct agent with enhanced reasoning capabilities
-        self.agent = ReActAgent(
-            tools=self.tools,
-            llm=self.llm,
-            verbose=True,
-            callback_manager=callback_manager,
-            system_prompt=self._get_system_prompt(),
-        )
 
-        # Create context for the agent session
-        self.ctx = Context(self.agent)
-
-        # Initialize short-term memory for continuous chat
-        self.memory = Memory.from_defaults(session_id=self.index_name)
-
-    def _get_system_prompt(self) -> str:
-        """Get the system prompt for the main agent with tool call limits."""
-        return """You are an AI learning assistant that helps generate educational content by researching codebases, Linear tickets, and Slack messages.
+    # Built once per process and passed verbatim as the first message of every
+    # ReAct step, so the provider can reuse its cached prefix across iterations.
+    SYSTEM_PROMPT: ClassVar[str] = """You are an AI learning assistant that helps generate educational content by researching codebases, Linear tickets, and Slack messages.
 
 Your capabilities:
 - Search through codebases to find relevant code patterns and implementations (search_codebase)
 - Look up Linear tickets to understand project requirements and issues (search_linear_ticket)  
 - Search Slack messages to find team discussions and decisions (search_slack_messages)
-- Generate educational videos with narration and bullet points (create_educational_video)
+- Search code, Linear tickets and Slack messages in parallel with one call (search_all) - prefer it when more than one source could hold the answer
+- Generate educational videos with narration and bullet points (create_educational_video, then check_video_status for the URL)
 
 CRITICAL TOOL USAGE LIMITS:
-- You are LIMITED to a MAXIMUM of 8 total informational tool calls (search_codebase, search_linear_ticket, search_slack_messages combined)
+- You are LIMITED to a MAXIMUM of 8 total informational tool calls (search_codebase, search_linear_ticket, search_slack_messages, search_all combined)
 - After 8 informational tool calls, you MUST proceed to generate videos and provide your final response
-- Video generation (create_educational_video) does NOT count toward this limit
+- Video generation (create_educational_video, check_video_status) does NOT count toward this limit
 - Plan your searches strategically to gather the most important information within this limit
 
 Search Strategy Guidelines:
@@ -99,22 +68,71 @@ When you reach the 8-call limit:
 - Do not ask for permission or indicate you need more searches - work with what you have
 
 Remember: Quality over quantity - make each tool call count toward creating the best possible educational content."""
+    
+    def __init__(self, username: str, model: str = "gpt-5-mini", temperature: float = 0.1):
+        self.index_name = f"{username}-user-database"
+
+        # Reuse the process-wide callback manager instead of one per session
+        callback_manager = agent_helpers.shared_callback_manager
+
+        # Initialize OpenAI LLM for ReAct agent compatibility
+        self.llm = agent_helpers.get_llm(model, temperature)
+
+        # Build the per-namespace indexes once; the tools reuse them from the cache
+        agent_helpers.prewarm_indexes(self.index_name)
+        agent_helpers.start_warmup(self.index_name)
+
+        # Informational search calls allowed per query, enforced by the tools themselves.
+        # Each query/stream starts its own count, so concurrent requests don't share it.
+        self._max_tool_calls = 8
+
+        # Create tools and agent
+        self.tools = agent_tools.create_agent_tools(self.index_name)
+
+        # Create ReAct agent with enhanced reasoning capabilities
+        self.agent = ReActAgent(
+            tools=self.tools,
+            llm=self.llm,
+            verbose=constants.DEBUG,
+            callback_manager=callback_manager,
+            system_prompt=self.SYSTEM_PROMPT,
+        )
+
+        # Create context for the agent session
+        self.ctx = Context(self.agent)
+
+        # Initialize short-term memory for continuous chat
+        self.memory = Memory.from_defaults(session_id=self.index_name)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Run a query and yield the final answer as it is generated.
+
+        query() still returns the complete response; use this when the caller can
+        forward partial text to the client instead of waiting for the full generation.
+        """
+        agent_tools.start_tool_budget(self._max_tool_calls)
+        handler = self.agent.run(prompt, ctx=self.ctx, memory=self.memory)
+        with latency_tracker.measure("agent_run", index=self.index_name, stream=True):
+            async for delta in agent_helpers.stream_final_answer(handler):
+                yield delta
 
     async def query(self, prompt: str) -> str:
         """Execute a query against the codebase using the ReAct agent."""
         try:
-            print("Starting ReAct agent execution...")
+            logger.debug("Starting ReAct agent execution")
+
+            # Each query starts with a fresh tool budget
+            agent_tools.start_tool_budget(self._max_tool_calls)
 
             # Use ReAct agent's run method with context and memory
             handler = self.agent.run(prompt, ctx=self.ctx, memory=self.memory)
 
             # Get final response
-            response = await handler
+            with latency_tracker.measure("agent_run", index=self.index_name):
+                response = await handler
 
             return str(response)
 
         except Exception as e:
-            print(f"❌ Error executing query: {str(e)}")
-            import traceback
-            print(f"   📋 Traceback: {traceback.format_exc()}")
+            logger.exception("Error executing query")
             return f"Error executing query: {str(e)}"
\ No newline at end of file
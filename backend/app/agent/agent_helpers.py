@@ -4,32 +4,303 @@ Helper functions and tools for the LessonAgent.
 Contains non-agent specific functionality like tool creation, search functions, and utilities.
 """
 
-from typing import Dict
+import asyncio
+import logging
+import threading
+import weakref
+from functools import lru_cache
+from typing import Any, AsyncIterator, List, Tuple, Union
+import httpx
+import pinecone
 from llama_index.vector_stores.pinecone import PineconeVectorStore
 from llama_index.embeddings.openai import OpenAIEmbedding
+from llama_index.llms.openai import OpenAI
 from llama_index.core import VectorStoreIndex
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.vector_stores import FilterOperator, MetadataFilter, MetadataFilters
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.callbacks import CallbackManager, LlamaDebugHandler
+from llama_index.core.agent.workflow import AgentStream
+from app.agent.query_cache import QueryCache
 import app.constants as constants
 
+logger = logging.getLogger(__name__)
 
-def create_vectorstore_index(index_name: str = "codebase", namespace: str = "codevectors") -> VectorStoreIndex:
-    """Create a LlamaIndex VectorStoreIndex using Pinecone with native LlamaIndex integration."""
+# Pinecone namespaces searched by the agent tools
+SEARCH_NAMESPACES = ("codevectors", "linear-tickets", "slack-messages")
 
-    # Create vector store using LlamaIndex's native Pinecone integration
-    vector_store = PineconeVectorStore(
-        api_key=constants.PINECONE_API_KEY,
-        index_name=index_name,
-        environment=constants.PINECONE_ENV,
-        namespace=namespace,
-    )
+# One callback manager shared by every agent in the process. LlamaDebugHandler prints the
+# whole trace tree at the end of each run and keeps every event pair in memory, so it is
+# only attached in DEBUG.
+shared_callback_manager = CallbackManager(
+    [LlamaDebugHandler(print_trace_on_end=True)] if constants.DEBUG else []
+)
+
+
+class _PerLoopAsyncClient(httpx.AsyncClient):
+    """httpx.AsyncClient that keeps a separate connection pool for each event loop.
+
+    Pooled async connections belong to the loop that opened them, so one module-level
+    AsyncClient breaks as soon as a second loop (asyncio.run in a script, a thread's
+    loop) reuses it. Requests are built here but sent through the running loop's own
+    client, created on first use and dropped along with its loop.
+    """
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._client_kwargs = kwargs
+        self._loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _loop_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._loop_clients.get(loop)
+        if client is None or client.is_closed:
+            client = self._loop_clients[loop] = httpx.AsyncClient(**self._client_kwargs)
+        return client
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        return await self._loop_client().send(request, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the running loop's pool; other loops' pools close with their loops."""
+        client = self._loop_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+# Connection pools shared by every OpenAI client in the process (LLMs and embeddings),
+# so concurrent sessions reuse warm keep-alive connections instead of new TLS handshakes
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+shared_http_client = httpx.Client(limits=_HTTP_LIMITS)
+shared_async_http_client = _PerLoopAsyncClient(limits=_HTTP_LIMITS)
+
+
+@lru_cache(maxsize=None)
+def get_embedding_model() -> BaseEmbedding:
+    """Return the process-wide embedding model so its HTTP session is reused across indexes.
+
+    EMBEDDING_PROVIDER=fastembed embeds locally with an ONNX model instead of calling
+    OpenAI; EMBEDDING_PROVIDER=huggingface runs a sentence-transformers model on the GPU
+    when one is available. The default 1024-dim bge-large models match the existing
+    index dimension.
+    """
+    if constants.EMBEDDING_PROVIDER == "fastembed":
+        from llama_index.embeddings.fastembed import FastEmbedEmbedding
+
+        return FastEmbedEmbedding(model_name=constants.FASTEMBED_MODEL)
 
-    # Create embedding model
-    embedding = OpenAIEmbedding(
+    if constants.EMBEDDING_PROVIDER == "huggingface":
+        from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+        # device=None lets sentence-transformers pick CUDA/MPS before falling back to CPU
+        return HuggingFaceEmbedding(
+            model_name=constants.HUGGINGFACE_EMBED_MODEL,
+            device=constants.EMBEDDING_DEVICE or None,
+        )
+
+    return OpenAIEmbedding(
         model="text-embedding-3-large",
         dimensions=1024,
         api_key=constants.OPENAI_API_KEY,
+        http_client=shared_http_client,
+        async_http_client=shared_async_http_client,
+    )
+
+
+def llm_request_kwargs() -> dict:
+    """OpenAI options shared by the agent LLMs (latency tier, retries, timeout, HTTP pools)."""
+    kwargs = {
+        "max_retries": 2,
+        "timeout": constants.OPENAI_TIMEOUT_SECONDS,
+        "http_client": shared_http_client,
+        "async_http_client": shared_async_http_client,
+    }
+    if constants.OPENAI_SERVICE_TIER:
+        kwargs["additional_kwargs"] = {"service_tier": constants.OPENAI_SERVICE_TIER}
+    return kwargs
+
+
+@lru_cache(maxsize=8)
+def get_llm(model: str, temperature: float) -> OpenAI:
+    """Return the process-wide LLM for (model, temperature), shared by every agent session.
+
+    The LLM holds no per-conversation state (that lives in each agent's Context and
+    Memory), so sessions only differ by these two settings.
+    """
+    return OpenAI(
+        model=model,
+        api_key=constants.OPENAI_API_KEY,
+        temperature=temperature,
+        callback_manager=shared_callback_manager,
+        **llm_request_kwargs(),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_pinecone_client() -> pinecone.Pinecone:
+    """Return the process-wide Pinecone client.
+
+    With PINECONE_USE_GRPC the client talks gRPC (protobuf over one multiplexed
+    HTTP/2 channel per index), which suits the concurrent search_all fan-out.
+    """
+    client_cls = pinecone.Pinecone
+    if constants.PINECONE_USE_GRPC:
+        try:
+            from pinecone.grpc import PineconeGRPC
+
+            client_cls = PineconeGRPC
+        except ImportError:
+            logger.warning("PINECONE_USE_GRPC is set but pinecone[grpc] is not installed; using REST")
+
+    return client_cls(api_key=constants.PINECONE_API_KEY, pool_threads=constants.PINECONE_POOL_THREADS)
+
+
+@lru_cache(maxsize=16)
+def get_pinecone_index(index_name: str) -> Any:
+    """Return one data-plane handle per Pinecone index, shared by all of its namespaces."""
+    return get_pinecone_client().Index(index_name, pool_threads=constants.PINECONE_POOL_THREADS)
+
+
+@lru_cache(maxsize=16)
+def create_vectorstore_index(index_name: str = "codebase", namespace: str = "codevectors") -> VectorStoreIndex:
+    """Create a LlamaIndex VectorStoreIndex using Pinecone with native LlamaIndex integration.
+
+    Indexes are memoized per (index_name, namespace) so tool calls after the first
+    reuse the same Pinecone client instead of rebuilding it; the namespaces of one
+    index also share a single pooled index handle.
+
+    The per-user Pinecone index is expected to be a serverless index with
+    dimension=1024 and metric=cosine. Pinecone always serves queries from its own
+    ANN structure and exposes no efSearch/nprobe knob, so recall/latency is tuned
+    through similarity_top_k and metadata filters rather than graph parameters.
+    Serverless indexes also have no scalar/int8 quantization setting (that is a
+    Qdrant collection option); vector size is kept down instead by requesting
+    1024-dim text-embedding-3-large vectors rather than the native 3072.
+    """
+
+    # Create vector store using LlamaIndex's native Pinecone integration
+    vector_store = PineconeVectorStore(
+        pinecone_index=get_pinecone_index(index_name),
+        namespace=namespace,
     )
 
     # Create and return VectorStoreIndex
     return VectorStoreIndex.from_vector_store(
-        vector_store=vector_store, embed_model=embedding
-    )
\ No newline at end of file
+        vector_store=vector_store, embed_model=get_embedding_model()
+    )
+
+
+def build_metadata_filters(filters: Tuple[Tuple[str, Any], ...]) -> MetadataFilters:
+    """Turn (key, value) pairs into Pinecone-side metadata filters; tuple values match any member."""
+    return MetadataFilters(
+        filters=[
+            MetadataFilter(key=key, value=list(value), operator=FilterOperator.IN)
+            if isinstance(value, tuple)
+            else MetadataFilter(key=key, value=value, operator=FilterOperator.EQ)
+            for key, value in filters
+        ]
+    )
+
+
+def get_retriever(
+    index_name: str, namespace: str, k: int = 5, filters: Tuple[Tuple[str, Any], ...] = ()
+) -> BaseRetriever:
+    """Return a retriever for (index_name, namespace, k, filters), reused across tool calls.
+
+    Matches are fetched without their stored vectors: the tools only read text and
+    metadata, and 1024 floats per match would otherwise dominate the response size.
+    Metadata filters are applied by Pinecone before ranking, not on the returned hits.
+    """
+    # Always key the cache positionally, so defaulted and explicit calls share an entry
+    return _cached_retriever(index_name, namespace, k, filters)
+
+
+@lru_cache(maxsize=64)
+def _cached_retriever(
+    index_name: str, namespace: str, k: int, filters: Tuple[Tuple[str, Any], ...]
+) -> BaseRetriever:
+    index = create_vectorstore_index(index_name, namespace)
+    return index.as_retriever(
+        similarity_top_k=k,
+        filters=build_metadata_filters(filters) if filters else None,
+        vector_store_kwargs={"include_values": False},
+    )
+
+
+# Query embeddings by raw query string. The agent often sends the same query to several
+# search tools in a row; each after the first reuses the vector instead of calling the API.
+_query_embeddings = QueryCache(max_size=1024, ttl_seconds=24 * 3600.0)
+
+
+async def embed_query_async(query: str) -> List[float]:
+    """Embed a search query with the shared embedding model, memoized per query string."""
+    embedding = _query_embeddings.get(query)
+    if embedding is None:
+        embedding = await get_embedding_model().aget_query_embedding(query)
+        _query_embeddings.set(query, embedding)
+    return embedding
+
+
+async def retrieve_async(
+    retriever: BaseRetriever, query: Union[str, QueryBundle]
+) -> List[NodeWithScore]:
+    """Run a retrieval on a worker thread.
+
+    PineconeVectorStore has no native async query (aquery falls back to the blocking
+    REST call), so awaiting aretrieve would still stall the event loop for the whole
+    Pinecone round trip. Pass a QueryBundle carrying an embedding to skip re-embedding.
+    """
+    return await asyncio.to_thread(retriever.retrieve, query)
+
+
+async def stream_final_answer(handler) -> AsyncIterator[str]:
+    """Yield the ReAct final answer incrementally from a running agent handler.
+
+    Each ReAct step streams "Thought/Action" text before the tool runs; only the text
+    after the "Answer:" marker of the final step is user-facing, so everything else
+    is skipped. The handler is awaited at the end so errors propagate.
+    """
+    emitted = 0
+    async for event in handler.stream_events():
+        if not isinstance(event, AgentStream):
+            continue
+        _, marker, answer = event.response.partition("Answer:")
+        if not marker:
+            emitted = 0
+            continue
+        answer = answer.lstrip()
+        if len(answer) > emitted:
+            yield answer[emitted:]
+            emitted = len(answer)
+    await handler
+
+
+def prewarm_indexes(index_name: str) -> None:
+    """Build the index and default-k retriever for every search namespace up front,
+    so tool calls only hit the caches."""
+    for namespace in SEARCH_NAMESPACES:
+        get_retriever(index_name, namespace)
+
+
+def _warm_connections(index_name: str) -> None:
+    try:
+        get_pinecone_index(index_name).describe_index_stats()
+        get_embedding_model().get_query_embedding("warmup")
+    except Exception:
+        logger.debug("Warmup for %s failed; the first tool call will connect instead", index_name, exc_info=True)
+
+
+@lru_cache(maxsize=None)
+def start_warmup(index_name: str) -> None:
+    """Open the Pinecone and embedding connections for index_name once, off the request path.
+
+    Runs in a daemon thread so the TLS handshakes and first embedding call happen
+    while the agent is still planning instead of inside its first tool call.
+    """
+    if constants.AGENT_WARMUP:
+        threading.Thread(
+            target=_warm_connections, args=(index_name,), name=f"warmup-{index_name}", daemon=True
+        ).start()
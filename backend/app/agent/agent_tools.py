@@ -1,227 +1,406 @@
-from typing import List
-from llama_index.core import VectorStoreIndex
+import asyncio
+import io
+import logging
+import re
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from llama_index.core.tools import FunctionTool
-import app.agent.agent_helpers as agent_helpers
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from app.agent import agent_helpers
+from app.agent.query_cache import get_search_cache, semantic_cache, normalize_query
+from app.agent.latency import latency_tracker
+import hashlib
 import json
 import os
-from app.agent.video.text_bullet_video import create_text_bullet_video_from_json
+from app.agent.video.video_jobs import get_video_future, submit_video_job, video_job_status
+
+try:
+    import blake3
+except ImportError:  # optional; hashlib's SHA-256 is used instead
+    blake3 = None
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used instead
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Linear ticket metadata fields (as written by LinearClient.process_ticket) returned to the agent
+_TICKET_META_KEYS = ("identifier", "title", "state", "priority", "assignee", "url", "updated_at")
+# Slack metadata fields (as written by SlackClient.process_message) beyond channel/user/time
+_SLACK_META_KEYS = ("thread_ts", "subtype")
+
+# Video tool bullet parsing: items are separated by commas or newlines
+_BULLET_RE = re.compile(r"[^\n,]+")
+_BULLET_LEAD_RE = re.compile(r"^[\s•\-*]+")
+
+BUDGET_EXHAUSTED_MESSAGE = (
+    "Tool budget exhausted: no more informational searches are allowed for this request. "
+    "Proceed with the information you have already gathered."
+)
+
+
+# Informational tool calls made in the current agent run. Each query/stream starts its
+# own budget, and the tools read it from the context of the run that called them, so
+# concurrent runs on one shared agent never draw from each other's count.
+_tool_budget: ContextVar[Optional[Dict[str, int]]] = ContextVar("tool_budget", default=None)
+
+
+def start_tool_budget(max_calls: int) -> None:
+    """Give the current run (and the tool calls it makes) a fresh budget of max_calls."""
+    _tool_budget.set({"used": 0, "max": max_calls})
+
+
+def _consume_budget() -> bool:
+    """Count one informational tool call; return False once the run's budget is used up.
+
+    Calls outside an agent run are not limited. The check and increment have no await
+    between them, so parallel tool calls within one run can't both take the last call.
+    """
+    budget = _tool_budget.get()
+    if budget is None:
+        return True
+    if budget["used"] >= budget["max"]:
+        return False
+    budget["used"] += 1
+    return True
+
+def _filter_key(filters: Optional[Dict[str, Any]]) -> Tuple[Tuple[str, Any], ...]:
+    """Normalize a tool's metadata filter dict into a hashable, order-independent key."""
+    if not filters:
+        return ()
+    return tuple(
+        sorted((str(key), tuple(value) if isinstance(value, list) else value) for key, value in filters.items())
+    )
 
-def create_codebase_search_tool(index_name: str) -> FunctionTool:
-    def search_func(query: str, k: int = 5) -> str:
+# Per-result templates for the text handed back to the agent, filled positionally from
+# one precomputed row per node
+_CODEBASE_RESULT = "\nResult {0}:\nFile: {1}\nContent: {2}...\nScore: {3}\n"
+_TICKET_RESULT = "\nResult {0} (Score: {1}):\n{2}...\nMetadata: {3}\n"
+_SLACK_RESULT = "\nResult {0} (Score: {1}):\nChannel: {2}\nUser: {3}\nTime: {4}\nMessage: {5}...\n{6}"
+_UNIFIED_RESULT = "\nResult {i} [{source}] (Score: {score:.3f}):\n{label}\nContent: {preview}...\n"
+
+def _preview(content: Optional[str]) -> str:
+    """Truncate node text for the agent-facing preview."""
+    return content[:500] if content else "No content available"
+
+def _json_dumps(payload: Any) -> str:
+    """Serialize tool output to JSON, with orjson when it is installed; unknown types fall back to str."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=str).decode()
+    return json.dumps(payload, default=str)
+
+async def batch_search(
+    index_name: str, namespace: str, queries: List[str], k: int = 5
+) -> List[List[NodeWithScore]]:
+    """Run several retrievals against one namespace concurrently, preserving query order."""
+    retriever = agent_helpers.get_retriever(index_name, namespace, k)
+    return list(await asyncio.gather(*(agent_helpers.retrieve_async(retriever, q) for q in queries)))
+
+def _format_codebase_results(nodes: List[NodeWithScore]) -> str:
+    rows = [
+        (i, node.node.metadata.get("file_path", "Unknown"), _preview(node.node.text), node.score)
+        for i, node in enumerate(nodes, 1)
+    ]
+    if logger.isEnabledFor(logging.DEBUG):
+        for i, file_path, _, score in rows:
+            logger.debug("Result %d: %s (score: %s)", i, file_path, score)
+    return "".join([_CODEBASE_RESULT.format(*row) for row in rows])
+
+def _format_linear_ticket_results(nodes: List[NodeWithScore]) -> str:
+    # Only the fields the agent uses; everything else is wasted prompt tokens
+    rows = [
+        (i, node.score, _preview(node.node.text),
+         _json_dumps({key: metadata[key] for key in _TICKET_META_KEYS if key in metadata}))
+        for i, node in enumerate(nodes, 1)
+        for metadata in (node.node.metadata,)
+    ]
+    if logger.isEnabledFor(logging.DEBUG):
+        for i, node in enumerate(nodes, 1):
+            metadata = node.node.metadata
+            logger.debug(
+                "Result %d: %s - %s (score: %s)",
+                i, metadata.get("identifier", "Unknown"), metadata.get("title", "No title"), node.score,
+            )
+    return "".join([_TICKET_RESULT.format(*row) for row in rows])
+
+def _slack_extra(metadata: Dict[str, Any]) -> str:
+    """Channel/user/time are already in the result; only thread context is worth the tokens."""
+    extra = {key: metadata[key] for key in _SLACK_META_KEYS if key in metadata}
+    return f"Metadata: {_json_dumps(extra)}\n" if extra else ""
+
+def _format_slack_results(nodes: List[NodeWithScore]) -> str:
+    rows = [
+        (i, node.score, metadata.get("channel_id", "Unknown"), metadata.get("username", "Unknown user"),
+         metadata.get("ts", "Unknown time"), _preview(node.node.text), _slack_extra(metadata))
+        for i, node in enumerate(nodes, 1)
+        for metadata in (node.node.metadata,)
+    ]
+    if logger.isEnabledFor(logging.DEBUG):
+        for i, score, channel, user, *_ in rows:
+            logger.debug("Result %d: %s - %s (score: %s)", i, channel, user, score)
+    return "".join([_SLACK_RESULT.format(*row) for row in rows])
+
+async def _cached_retrieve(
+    index_name: str,
+    namespace: str,
+    query: str,
+    k: int,
+    tool_name: str,
+    format_nodes: Callable[[List[NodeWithScore]], str],
+    filters: Tuple[Tuple[str, Any], ...] = (),
+) -> str:
+    """Search one namespace and format the hits, serving repeats from the caches.
+
+    Exact repeats hit the namespace's exact cache without embedding. Otherwise the query is embedded
+    once; a paraphrase of an earlier query is answered from semantic_cache, and on a
+    miss the same embedding is sent to Pinecone so the retriever does not embed again.
+    """
+    search_cache = get_search_cache(namespace)
+    cache_key = (index_name, normalize_query(query), k, filters)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("Returning cached search results for %r", query)
+        return cached
+
+    embedding = await agent_helpers.embed_query_async(query)
+    semantic_key = (index_name, namespace, k, filters)
+    cached = semantic_cache.get(semantic_key, embedding)
+    if cached is not None:
+        logger.debug("Returning semantically cached search results for %r", query)
+        search_cache.set(cache_key, cached)
+        return cached
+
+    # Reuse the cached retriever for this namespace and top-k
+    retriever = agent_helpers.get_retriever(index_name, namespace, k, filters)
+    with latency_tracker.measure("tool_call", tool=tool_name, k=k):
+        nodes = await agent_helpers.retrieve_async(
+            retriever, QueryBundle(query_str=query, embedding=embedding)
+        )
+
+    if not nodes:
+        logger.debug("No results found for query %r", query)
+        return f"No results found for query: '{query}'. Try a different search term or check if the index contains relevant data."
+
+    logger.debug("Found %d results", len(nodes))
+    result = format_nodes(nodes)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Returning %d characters of search results", len(result))
+    search_cache.set(cache_key, result)
+    semantic_cache.set(semantic_key, embedding, result)
+    return result
+
+# (tool name, Pinecone namespace, label used in error messages, result formatter, description)
+_SEARCH_TOOLS = (
+    (
+        "search_codebase",
+        "codevectors",
+        "codebase",
+        _format_codebase_results,
+        """Search our company's codebase using vector similarity search. 
+        IMPORTANT: This is a vector database that finds semantically similar code chunks, not exact text matching.
+        Parameters:
+        - query: Search query string
+        - k: Number of results to return (default: 5)
+        - filters: Optional exact-match metadata filter, e.g. {"file_path": "src/auth/session.py"}
+        Returns: Raw code chunks with file paths and similarity scores. You'll get multiple chunks that you need to analyze and synthesize to understand our architectural patterns.""",
+    ),
+    (
+        "search_linear_ticket",
+        "linear-tickets",
+        "linear ticket",
+        _format_linear_ticket_results,
+        """Search our company's linear tickets using vector similarity search. 
+        IMPORTANT: This is a vector database that finds semantically similar ticket chunks, not exact text matching.
+        Parameters:
+        - query: Search query string
+        - k: Number of results to return (default: 5)
+        - filters: Optional exact-match metadata filter on state, project, assignee or priority,
+          e.g. {"project": "Mobile App"}; a list value matches any of its items
+        Returns: Content preview and key metadata (identifier, title, state, priority, assignee, url) for matching tickets with similarity scores.""",
+    ),
+    (
+        "search_slack_messages",
+        "slack-messages",
+        "slack messages",
+        _format_slack_results,
+        """Search our company's Slack messages using vector similarity search. 
+        IMPORTANT: This is a vector database that finds semantically similar message chunks, not exact text matching.
+        Parameters:
+        - query: Search query string
+        - k: Number of results to return (default: 5)
+        - filters: Optional exact-match metadata filter on channel_id or username,
+          e.g. {"channel_id": "C0123456"}; a list value matches any of its items
+        Returns: Message content with channel, user, timestamp and thread metadata with similarity scores.""",
+    ),
+)
+
+def _make_search_tool(
+    index_name: str,
+    tool_name: str,
+    namespace: str,
+    label: str,
+    format_nodes: Callable[[List[NodeWithScore]], str],
+    description: str,
+) -> FunctionTool:
+    async def search_func(query: str, k: int = 5, filters: Optional[Dict[str, Any]] = None) -> str:
         try:
-            print("🔍 TOOL CALL: search_codebase")
-            print(f"   📝 Query: '{query}'")
-            print(f"   🔢 Top-k: {k}")
+            logger.debug("Tool call %s query=%r k=%d filters=%r", tool_name, query, k, filters)
+            if not _consume_budget():
+                logger.debug("Tool budget exhausted, skipping %s", tool_name)
+                return BUDGET_EXHAUSTED_MESSAGE
 
-            index = agent_helpers.create_vectorstore_index(index_name, namespace="codevectors")
-
-            # Use LlamaIndex's retriever without namespace in kwargs
-            retriever = index.as_retriever(similarity_top_k=k)
-            print("   🔄 Retrieving nodes from vector store...")
-            nodes = retriever.retrieve(query)
-
-            if not nodes:
-                print(f"   ❌ No results found for query: '{query}'")
-                return f"No results found for query: '{query}'. Try a different search term or check if the index contains relevant data."
-
-            print(f"   ✅ Found {len(nodes)} results")
-            # Format results for the agent
-            formatted_results = []
-            for i, node in enumerate(nodes, 1):
-                # Extract content and metadata directly from TextNode
-                content = node.text if hasattr(node, "text") else node.node.text
-                file_path = (
-                    node.metadata.get("file_path", "Unknown")
-                    if hasattr(node, "metadata")
-                    else node.node.metadata.get("file_path", "Unknown")
-                )
-                score = node.score if hasattr(node, "score") else "N/A"
-
-                # Truncate content for preview
-                content_preview = content[:500] if content else "No content available"
-
-                formatted_results.append(f"""
-                    Result {i}:
-                    File: {file_path}
-                    Content: {content_preview}...
-                    Score: {score}
-                """)
-                print(f"     📄 Result {i}: {file_path} (score: {score})")
-
-            result = "\n".join(formatted_results)
-            print(f"   📤 Returning {len(result)} characters of search results")
-            return result
+            return await _cached_retrieve(
+                index_name, namespace, query, k, tool_name, format_nodes, _filter_key(filters)
+            )
 
         except Exception as e:
-            error_msg = f"❌ Error searching codebase: {str(e)}"
-            print(error_msg)  # Also print for debugging
-            return error_msg
-
-    return FunctionTool.from_defaults(
-        fn=search_func,
-        name="search_codebase",
-        description="""Search our company's codebase using vector similarity search. 
-        IMPORTANT: This is a vector database that finds semantically similar code chunks, not exact text matching.
-        Returns: Raw code chunks with file paths and similarity scores. You'll get multiple chunks that you need to analyze and synthesize to understand our architectural patterns.""",
-    )
+            logger.exception("Error searching %s", label)
+            return f"❌ Error searching {label}: {str(e)}"
 
-def create_linear_ticket_search_tool(index_name: str) -> FunctionTool:
-    def search_func(query: str, k: int = 5) -> str:
-        try:
-            print("🔍 TOOL CALL: search_linear_ticket")
-            print(f"   📝 Query: '{query}'")
-            print(f"   🔢 Top-k: {k}")
+    return FunctionTool.from_defaults(async_fn=search_func, name=tool_name, description=description)
 
-            index = agent_helpers.create_vectorstore_index(index_name, namespace="linear-tickets")
+def create_search_tools(index_name: str) -> List[FunctionTool]:
+    """Create the per-source search tools (codebase, Linear tickets, Slack messages)."""
+    return [_make_search_tool(index_name, *config) for config in _SEARCH_TOOLS]
 
-            # Use LlamaIndex's retriever without namespace in kwargs
-            retriever = index.as_retriever(similarity_top_k=k)
-            print("   🔄 Retrieving nodes from vector store...")
-            nodes = retriever.retrieve(query)
+# (source label, Pinecone namespace, score weight) searched by the fused search_all tool
+_UNIFIED_SOURCES = (
+    ("codebase", "codevectors", 0.7),
+    ("linear_ticket", "linear-tickets", 0.3),
+    ("slack", "slack-messages", 0.3),
+)
 
-            if not nodes:
-                print(f"   ❌ No results found for query: '{query}'")
-                return f"No results found for query: '{query}'. Try a different search term or check if the index contains relevant data."
-
-            print(f"   ✅ Found {len(nodes)} results")
-            # Format results for the agent
-            formatted_results = []
-            for i, node in enumerate(nodes, 1):
-                # Extract content and metadata directly from TextNode
-                content = node.text if hasattr(node, "text") else node.node.text
-                metadata = (
-                    node.metadata
-                    if hasattr(node, "metadata")
-                    else node.node.metadata
+def create_unified_search_tool(index_name: str) -> FunctionTool:
+    async def search_func(query: str, k: int = 5) -> str:
+        try:
+            logger.debug("Tool call %s query=%r k=%d", "search_all", query, k)
+            if not _consume_budget():
+                logger.debug("Tool budget exhausted, skipping %s", "search_all")
+                return BUDGET_EXHAUSTED_MESSAGE
+
+            search_cache = get_search_cache("search_all")
+            cache_key = (index_name, normalize_query(query), k)
+            cached = search_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Returning cached search results for %r", query)
+                return cached
+
+            # Embed once and query every namespace concurrently, so the wait is the
+            # slowest namespace rather than the sum of all three. Pinecone serves one
+            # namespace per query request (query_namespaces is the same fan-out done
+            # client-side, merged by raw score, which would lose the source weights);
+            # the retrievers share one index handle and its connection pool.
+            retrievers = [
+                agent_helpers.get_retriever(index_name, namespace, k)
+                for _, namespace, _ in _UNIFIED_SOURCES
+            ]
+            with latency_tracker.measure("tool_call", tool="search_all", k=k):
+                bundle = QueryBundle(
+                    query_str=query, embedding=await agent_helpers.embed_query_async(query)
                 )
-                score = node.score if hasattr(node, "score") else "N/A"
-
-                # Get basic info for logging
-                ticket_id = metadata.get("identifier", "Unknown")
-                title = metadata.get("title", "No title")
+                results = await asyncio.gather(*(agent_helpers.retrieve_async(r, bundle) for r in retrievers))
+
+            # Blend scores by source weight, then keep the overall top-k distinct previews.
+            # A Slack message quoting a ticket (or a ticket pasting code) would otherwise
+            # spend two result slots on the same text.
+            ranked = []
+            seen_previews = set()
+            for weighted_score, source, node in sorted(
+                (
+                    ((node.score or 0.0) * weight, source, node)
+                    for (source, _, weight), nodes in zip(_UNIFIED_SOURCES, results)
+                    for node in nodes
+                ),
+                key=lambda item: item[0],
+                reverse=True,
+            ):
+                # Truncated once per kept node; the same preview is deduped and rendered
+                preview = _preview(node.node.text)
+                preview_key = hash(preview.strip())
+                if preview_key in seen_previews:
+                    continue
+                seen_previews.add(preview_key)
+                ranked.append((weighted_score, source, node, preview))
+                if len(ranked) == k:
+                    break
+
+            if not ranked:
+                logger.debug("No results found for query %r", query)
+                return f"No results found for query: '{query}'. Try a different search term or check if the index contains relevant data."
 
-                # Truncate content for preview
-                content_preview = content[:500] if content else "No content available"
+            logger.debug("Found %d results", len(ranked))
+            buf = io.StringIO()
+            debug = logger.isEnabledFor(logging.DEBUG)
+            for i, (weighted_score, source, node, preview) in enumerate(ranked, 1):
+                metadata = node.node.metadata
+                if source == "codebase":
+                    label = f"File: {metadata.get('file_path', 'Unknown')}"
+                elif source == "slack":
+                    label = f"Slack: {metadata.get('channel_id', 'Unknown')} - {metadata.get('username', 'Unknown user')}"
+                else:
+                    label = f"Ticket: {metadata.get('identifier', 'Unknown')} - {metadata.get('title', 'No title')}"
 
-                formatted_results.append(f"""
-                    Result {i} (Score: {score}):
-                    {content_preview}...
-                    Metadata: {metadata}
-                """)
-                print(f"     🎫 Result {i}: {ticket_id} - {title} (score: {score})")
+                buf.write(_UNIFIED_RESULT.format(
+                    i=i, source=source, score=weighted_score, label=label, preview=preview
+                ))
+                if debug:
+                    logger.debug("Result %d: %s %s (score: %.3f)", i, source, label, weighted_score)
 
-            result = "\n".join(formatted_results)
-            print(f"   📤 Returning {len(result)} characters of search results")
+            result = buf.getvalue()
+            search_cache.set(cache_key, result)
             return result
 
         except Exception as e:
-            error_msg = f"❌ Error searching linear ticket: {str(e)}"
-            print(error_msg)  # Also print for debugging
-            return error_msg
+            logger.exception("Error in unified search")
+            return f"❌ Error searching all sources: {str(e)}"
 
     return FunctionTool.from_defaults(
-        fn=search_func,
-        name="search_linear_ticket",
-        description="""Search our company's linear tickets using vector similarity search. 
-        IMPORTANT: This is a vector database that finds semantically similar ticket chunks, not exact text matching.
+        async_fn=search_func,
+        name="search_all",
+        description="""Search our codebase, Linear tickets and Slack messages at once using vector similarity search.
+        Use this when a topic likely spans several sources; it costs a single tool call.
         Parameters:
         - query: Search query string
-        - k: Number of results to return (default: 5)
-        - namespace: Pinecone namespace to search in (default: 'linear-tickets')
-        Returns: Content preview and raw metadata for matching tickets with similarity scores.""",
+        - k: Number of combined results to return (default: 5)
+        Returns: The top matches across sources, each labelled with its source, weighted toward code.""",
     )
 
-def create_slack_search_tool(index_name: str) -> FunctionTool:
-    def search_func(query: str, k: int = 5) -> str:
-        try:
-            print("🔍 TOOL CALL: search_slack_messages")
-            print(f"   📝 Query: '{query}'")
-            print(f"   🔢 Top-k: {k}")
-
-            index = agent_helpers.create_vectorstore_index(index_name, namespace="slack-messages")
 
-            # Use LlamaIndex's retriever without namespace in kwargs
-            retriever = index.as_retriever(similarity_top_k=k)
-            print("   🔄 Retrieving nodes from vector store...")
-            nodes = retriever.retrieve(query)
+def _script_digest(script_data: dict) -> str:
+    """Content address for a video script: same title/narration/bullets -> same digest in every process."""
+    payload = json.dumps(script_data, sort_keys=True, separators=(",", ":")).encode()
+    if blake3 is not None:
+        return blake3.blake3(payload).hexdigest()[:16]
+    return hashlib.sha256(payload).hexdigest()[:16]
 
-            if not nodes:
-                print(f"   ❌ No results found for query: '{query}'")
-                return f"No results found for query: '{query}'. Try a different search term or check if the index contains relevant data."
-
-            print(f"   ✅ Found {len(nodes)} results")
-            # Format results for the agent
-            formatted_results = []
-            for i, node in enumerate(nodes, 1):
-                # Extract content and metadata directly from TextNode
-                content = node.text if hasattr(node, "text") else node.node.text
-                metadata = (
-                    node.metadata
-                    if hasattr(node, "metadata")
-                    else node.node.metadata
-                )
-                score = node.score if hasattr(node, "score") else "N/A"
-
-                # Get basic info for logging
-                channel = metadata.get("channel_id", "Unknown")
-                user = metadata.get("user_name", "Unknown user")
-                timestamp = metadata.get("timestamp", "Unknown time")
-
-                # Truncate content for preview
-                content_preview = content[:500] if content else "No content available"
-
-                formatted_results.append(f"""
-                    Result {i} (Score: {score}):
-                    Channel: {channel}
-                    User: {user}
-                    Time: {timestamp}
-                    Message: {content_preview}...
-                    Metadata: {metadata}
-                """)
-                print(f"     💬 Result {i}: {channel} - {user} (score: {score})")
-
-            result = "\n".join(formatted_results)
-            print(f"   📤 Returning {len(result)} characters of search results")
-            return result
-
-        except Exception as e:
-            error_msg = f"❌ Error searching slack messages: {str(e)}"
-            print(error_msg)  # Also print for debugging
-            return error_msg
-
-    return FunctionTool.from_defaults(
-        fn=search_func,
-        name="search_slack_messages",
-        description="""Search our company's Slack messages using vector similarity search. 
-        IMPORTANT: This is a vector database that finds semantically similar message chunks, not exact text matching.
-        Parameters:
-        - query: Search query string
-        - k: Number of results to return (default: 5)
-        Returns: Message content with channel, user, timestamp and metadata with similarity scores.""",
-    )
+def _video_module():
+    """Import the renderer on first use; manim (Cairo/Pango), av and friends cost
+    seconds and hundreds of MB, which chat-only agents should never pay."""
+    from app.agent.video import text_bullet_video
+    return text_bullet_video
 
 def create_simple_video_tool() -> FunctionTool:
     """Simple wrapper for video generation that takes individual parameters."""
     def simple_video_func(title: str, narration: str, bullet_points: str) -> str:
         try:
-            print("🎬 TOOL CALL: create_educational_video")
-            print(f"   📝 Title: {title}")
-            print(f"   🔊 Narration: {len(narration)} characters")
-            print(f"   📋 Bullet points: {bullet_points}")
+            logger.debug(
+                "Tool call %s title=%r narration_chars=%d bullet_points=%r",
+                "create_educational_video", title, len(narration), bullet_points,
+            )
             
             # Parse bullet points (assume comma or newline separated)
             # For code content: Each bullet should be 4-8 words, focusing on essential dev info
-            bullets = []
-            for point in bullet_points.replace('\n', ',').split(','):
-                point = point.strip()
-                if point:
-                    # Remove leading bullet symbols if present
-                    point = point.lstrip('•-*').strip()
-                    if point:
-                        bullets.append({"text": point})
+            # Leading bullet symbols are stripped from each item
+            bullets = [
+                {"text": text}
+                for match in _BULLET_RE.finditer(bullet_points)
+                if (text := _BULLET_LEAD_RE.sub("", match.group()).strip())
+            ]
             
             if not bullets:
-                return json.dumps({
+                return _json_dumps({
                     "status": "error",
                     "error": "No valid bullet points found. Please provide bullet points separated by commas or newlines."
                 })
@@ -242,65 +421,60 @@ def create_simple_video_tool() -> FunctionTool:
                 }
             }
             
-            # Create a temporary JSON file
-            script_hash = abs(hash(str(script_data)))  # Use abs to avoid negative hashes
-            temp_script_file = f"temp_video_script_{script_hash}.json"
-            
-            try:
-                # Write the script to a temporary file
-                with open(temp_script_file, 'w') as f:
-                    json.dump(script_data, f, indent=2)
-                
-                print(f"   🎥 Creating video from script: {title}")
-                print(f"   📋 Processing {len(bullets)} bullet points")
-                
-                # Generate the video
-                result = create_text_bullet_video_from_json(
-                    temp_script_file, 
-                    output_filename=f"educational_video_{script_hash}.mp4",
-                    upload_to_cloudinary_flag=True
-                )
-                
-                if result and result.get("cloudinary_link"):
-                    print(f"   ✅ Video generated and uploaded successfully!")
-                    return json.dumps({
-                        "status": "success",
-                        "video_url": result["cloudinary_link"],
-                        "local_path": result.get("local_path"),  # Will be None if deleted after upload
-                        "title": title,
-                        "message": "Video uploaded to Cloudinary and local file cleaned up" if not result.get("local_path") else "Video uploaded to Cloudinary"
-                    })
-                elif result and result.get("local_path"):
-                    print(f"   ⚠️ Video created but upload failed")
-                    return json.dumps({
-                        "status": "partial_success",
-                        "video_url": None,
-                        "local_path": result.get("local_path"),
-                        "error": "Upload failed",
-                        "title": title
-                    })
-                else:
-                    print(f"   ❌ Video generation failed")
-                    return json.dumps({
-                        "status": "error",
-                        "error": "Video generation failed. Please check the inputs and try again."
-                    })
-                    
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_script_file):
-                    os.remove(temp_script_file)
-                    
+            script_hash = _script_digest(script_data)
+            output_filename = f"educational_video_{script_hash}.mp4"
+
+            video = _video_module()
+
+            # The digest is stable across processes, so a script uploaded by any earlier
+            # run is served without TTS, rendering or upload
+            video_url = video.cached_video_url(os.path.splitext(output_filename)[0])
+            if video_url:
+                logger.info("Reusing uploaded video for %r", title)
+                return _json_dumps({
+                    "status": "success",
+                    "video_url": video_url,
+                    "local_path": None,
+                    "title": title,
+                    "message": "Identical video already uploaded to Cloudinary"
+                })
+
+            # Render in the background; the agent collects the URL with check_video_status.
+            # Identical scripts share one job, so a retried call does not render twice.
+            logger.info("Creating video %r with %d bullet points", title, len(bullets))
+            job_id = submit_video_job(
+                script_hash,
+                title,
+                video.create_text_bullet_video_from_dict,
+                script_data,
+                output_filename=output_filename,
+                upload_to_cloudinary_flag=False,
+                upload=video.upload_rendered_video
+            )
+            return _json_dumps({
+                "status": "pending",
+                "job_id": job_id,
+                "title": title,
+                "poll_url": f"/video/status/{job_id}",
+                "message": "Video is rendering. Call check_video_status with this job_id to get the video_url."
+            })
+
         except Exception as e:
             error_msg = f"Error creating video: {str(e)}"
-            print(error_msg)
-            return json.dumps({
+            logger.exception("Error creating video")
+            return _json_dumps({
                 "status": "error",
                 "error": error_msg
             })
     
+    async def simple_video_async(title: str, narration: str, bullet_points: str) -> str:
+        # The first call imports manim and every call touches the URL cache on disk;
+        # keep both off the event loop shared with other sessions' searches
+        return await asyncio.to_thread(simple_video_func, title, narration, bullet_points)
+
     return FunctionTool.from_defaults(
         fn=simple_video_func,
+        async_fn=simple_video_async,
         name="create_educational_video",
         description="""Create an educational video with narration and bullet points.
         This tool automatically generates a video with synchronized narration and animated bullet points.
@@ -326,33 +500,63 @@ def create_simple_video_tool() -> FunctionTool:
         - "The team used short-lived JWTs and shipped FRT-3 to implement refresh token usage"
         - "Practical edge cases seen in the code include network failures"
         
-        Returns: JSON with status and video_url field containing the Cloudinary link if successful.
-        Example: {"status": "success", "video_url": "https://res.cloudinary.com/your-cloud/video/upload/v123/educational_videos/generated_video_abc123.mp4", "title": "Video Title"}
+        Returns immediately with a job_id while the video renders in the background:
+        {"status": "pending", "job_id": "3f9c2a1b7d4e8f60", "title": "Video Title"}
+        Start every video you need first, then call check_video_status(job_id) for each to get its video_url.
         
         The video will show the title, then display bullet points one by one while the narration plays."""
     )
 
+# Short grace period for a render that is about to finish; longer renders report "pending"
+# and the agent polls again (or does other work) instead of holding one tool call open
+_VIDEO_STATUS_WAIT_SECONDS = 5
+
+def create_video_status_tool() -> FunctionTool:
+    async def status_func(job_id: str) -> str:
+        future = get_video_future(job_id)
+        if future is not None and not future.done():
+            try:
+                await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(future)), _VIDEO_STATUS_WAIT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+            except Exception:
+                pass  # reported by video_job_status below
+        return _json_dumps(video_job_status(job_id))
+
+    return FunctionTool.from_defaults(
+        async_fn=status_func,
+        name="check_video_status",
+        description="""Get the result of a video started with create_educational_video.
+        Parameters:
+        - job_id: The job_id returned by create_educational_video
+        Returns within a few seconds with JSON: status and, on success, the video_url
+        Cloudinary link to use in the video slide.
+        Renders take a minute or more; if status is "pending", continue with other work
+        and call it again later.""",
+    )
+
 def create_agent_tools(index_name: str) -> List[FunctionTool]:
     return [
-        create_codebase_search_tool(index_name), 
-        create_linear_ticket_search_tool(index_name),
-        create_slack_search_tool(index_name),
-        create_simple_video_tool()
+        *create_search_tools(index_name),
+        create_unified_search_tool(index_name),
+        create_simple_video_tool(),
+        create_video_status_tool()
     ]
 
 def create_chat_agent_tools(index_name: str) -> List[FunctionTool]:
     """Create tools specifically for chat interactions - only search tools, no video generation."""
     return [
-        create_codebase_search_tool(index_name), 
-        create_linear_ticket_search_tool(index_name),
-        create_slack_search_tool(index_name)
+        *create_search_tools(index_name),
+        create_unified_search_tool(index_name)
     ]
 
 def create_lesson_agent_tools(index_name: str) -> List[FunctionTool]:
     """Create tools specifically for lesson generation. Now uses the same simple video tool as regular agents."""
     return [
-        create_codebase_search_tool(index_name), 
-        create_linear_ticket_search_tool(index_name),
-        create_slack_search_tool(index_name),
-        create_simple_video_tool()
-    ]
\ No newline at end of file
+        *create_search_tools(index_name),
+        create_unified_search_tool(index_name),
+        create_simple_video_tool(),
+        create_video_status_tool()
+    ]
@@ -5,57 +5,26 @@ This agent can search and retrieve information but cannot generate lessons or vi
 Optimized for conversational Q&A about codebases, Linear tickets, and Slack messages.
 """
 
-from typing import Dict, Optional
+import logging
+import re
+from typing import AsyncIterator, ClassVar, Optional
 from llama_index.core.agent.workflow import ReActAgent
-from llama_index.llms.openai import OpenAI
-from llama_index.core.callbacks import CallbackManager, LlamaDebugHandler
 from llama_index.core.workflow import Context
+from llama_index.core.llms import ChatMessage
 from llama_index.core.memory import Memory
-import app.agent.agent_tools as agent_tools
-import app.agent.agent_helpers as agent_helpers
+from app.agent import agent_helpers, agent_tools
+from app.agent.latency import latency_tracker
 import app.constants as constants
 
+logger = logging.getLogger(__name__)
+
 
 class ChatAgent:
     """Specialized agent for chat interactions - can search and answer questions but cannot create lessons."""
-    
-    def __init__(self, username: str, model: str = "gpt-4o-mini", temperature: float = 0.2):
-        self.index_name = f"{username}-user-database"
-
-        # Set up debug handler for detailed logging
-        llama_debug = LlamaDebugHandler(print_trace_on_end=True)
-        callback_manager = CallbackManager([llama_debug])
-
-        # Initialize OpenAI LLM for ReAct agent compatibility
-        # Using slightly higher temperature for more conversational responses
-        self.llm = OpenAI(
-            model=model,
-            api_key=constants.OPENAI_API_KEY,
-            temperature=temperature,
-            callback_manager=callback_manager,
-        )
-
-        # Create chat-specific tools (no video generation)
-        self.tools = agent_tools.create_chat_agent_tools(self.index_name)
-
-        # Create ReAct agent with enhanced reasoning capabilities
-        self.agent = ReActAgent(
-            tools=self.tools,
-            llm=self.llm,
-            verbose=True,
-            callback_manager=callback_manager,
-            system_prompt=self._get_chat_system_prompt(),
-        )
-
-        # Create context for the agent session
-        self.ctx = Context(self.agent)
 
-        # Initialize short-term memory for continuous chat
-        self.memory = Memory.from_defaults(session_id=self.index_name)
-
-    def _get_chat_system_prompt(self) -> str:
-        """Get the system prompt for the chat agent."""
-        return """You are a helpful AI debugging assistant that guides users through investigating their own code issues.
+    # Built once per process and passed verbatim as the first message of every
+    # ReAct step, so the provider can reuse its cached prefix across iterations.
+    SYSTEM_PROMPT: ClassVar[str] = """You are a helpful AI debugging assistant that guides users through investigating their own code issues.
 
 **Your Role**: Help users debug and understand their code by guiding them through the investigation process, NOT by trying to fix issues yourself.
 
@@ -63,6 +32,7 @@ class ChatAgent:
 - Search codebases for relevant implementations
 - Look up Linear tickets for project context  
 - Search Slack messages for team discussions
+- search_all: searches code, Linear tickets and Slack in parallel for one tool call - prefer it when the question could be answered by more than one source or you are unsure where the answer lives
 
 **CRITICAL TOOL USAGE LIMITS**:
 - You are LIMITED to a MAXIMUM of 10 total tool calls per conversation
@@ -84,22 +54,125 @@ Brief answer in 1-2 sentences. Ask one focused follow-up question if needed.
 ```
 
 **Remember**: Your job is to help them investigate and learn, not to provide complete solutions. Keep responses extremely focused and actionable - MAXIMUM 2-3 SENTENCES TOTAL."""
+    
+    # Explicit lookup commands ("find the auth middleware", "search for retry config") are
+    # answered from one search_all call plus one short LLM summary instead of a ReAct loop.
+    # Questions (a "?" or a why/how/what-style word anywhere) always go through ReAct.
+    DIRECT_SEARCH_RE: ClassVar[re.Pattern] = re.compile(
+        r"^\s*(?:find|show me|search for|search|locate)\s+"
+        r"(?!.*\b(?:why|how|what|which|when|who|should|could|would|can|explain|fix|debug)\b)"
+        r"(?P<query>[^\n?]{3,120}?)[\s.!]*$",
+        re.IGNORECASE,
+    )
+
+    def __init__(self, username: str, model: str = "gpt-4o-mini", temperature: float = 0.2):
+        self.index_name = f"{username}-user-database"
+
+        # Reuse the process-wide callback manager instead of one per session
+        callback_manager = agent_helpers.shared_callback_manager
+
+        # Initialize OpenAI LLM for ReAct agent compatibility
+        # Using slightly higher temperature for more conversational responses
+        self.llm = agent_helpers.get_llm(model, temperature)
+
+        # Build the per-namespace indexes once; the tools reuse them from the cache
+        agent_helpers.prewarm_indexes(self.index_name)
+        agent_helpers.start_warmup(self.index_name)
+
+        # Informational search calls allowed per query, enforced by the tools themselves.
+        # Each query/stream starts its own count, so concurrent requests don't share it.
+        self._max_tool_calls = 10
+
+        # Create chat-specific tools (no video generation)
+        self.tools = agent_tools.create_chat_agent_tools(self.index_name)
+
+        self._search_all = next(tool for tool in self.tools if tool.metadata.name == "search_all")
+
+        # Create ReAct agent with enhanced reasoning capabilities
+        self.agent = ReActAgent(
+            tools=self.tools,
+            llm=self.llm,
+            verbose=constants.DEBUG,
+            callback_manager=callback_manager,
+            system_prompt=self.SYSTEM_PROMPT,
+        )
+
+        # Create context for the agent session
+        self.ctx = Context(self.agent)
+
+        # Initialize short-term memory for continuous chat
+        self.memory = Memory.from_defaults(session_id=self.index_name)
+
+    async def _direct_search(self, prompt: str) -> Optional[str]:
+        """Answer an explicit lookup command from search_all, or None to go through ReAct."""
+        match = self.DIRECT_SEARCH_RE.match(prompt)
+        if match is None:
+            return None
+
+        search_query = match.group("query")
+        agent_tools.start_tool_budget(self._max_tool_calls)
+        with latency_tracker.measure("chat_direct_search", index=self.index_name):
+            output = await self._search_all.acall(query=search_query)
+            results = str(output.content)
+            # Empty or failed searches get the full agent, which can rephrase and retry
+            if results.startswith(("No results", "❌", agent_tools.BUDGET_EXHAUSTED_MESSAGE)):
+                return None
+
+            # Same persona and 2-3 sentence limit as the ReAct answers; the raw hits
+            # are only context for this one completion
+            response = await self.llm.achat([
+                ChatMessage(role="system", content=self.SYSTEM_PROMPT),
+                ChatMessage(
+                    role="user",
+                    content=f"{prompt}\n\nSearch results:\n{results}\n\n"
+                    "Point me to where this lives using only these results.",
+                ),
+            ])
+        answer = str(response.message.content).strip()
+        await self.memory.aput_messages([
+            ChatMessage(role="user", content=prompt),
+            ChatMessage(role="assistant", content=answer),
+        ])
+        return answer
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Run a query and yield the final answer as it is generated.
+
+        query() still returns the complete response; use this when the caller can
+        forward partial text to the client instead of waiting for the full generation.
+        """
+        answer = await self._direct_search(prompt)
+        if answer is not None:
+            yield answer
+            return
+
+        agent_tools.start_tool_budget(self._max_tool_calls)
+        handler = self.agent.run(prompt, ctx=self.ctx, memory=self.memory)
+        with latency_tracker.measure("chat_agent_run", index=self.index_name, stream=True):
+            async for delta in agent_helpers.stream_final_answer(handler):
+                yield delta
 
     async def query(self, prompt: str) -> str:
         """Execute a chat query against the available data sources."""
         try:
-            print("Starting ChatAgent execution...")
+            answer = await self._direct_search(prompt)
+            if answer is not None:
+                return answer
+
+            logger.debug("Starting ChatAgent execution")
+
+            # Each query starts with a fresh tool budget
+            agent_tools.start_tool_budget(self._max_tool_calls)
 
             # Use ReAct agent's run method with context and memory
             handler = self.agent.run(prompt, ctx=self.ctx, memory=self.memory)
 
             # Get final response
-            response = await handler
+            with latency_tracker.measure("chat_agent_run", index=self.index_name):
+                response = await handler
 
             return str(response)
 
         except Exception as e:
-            print(f"❌ Error executing chat query: {str(e)}")
-            import traceback
-            print(f"   📋 Traceback: {traceback.format_exc()}")
+            logger.exception("Error executing chat query")
             return f"I'm sorry, I encountered an error while processing your question: {str(e)}. Please try rephrasing your question or ask something else."
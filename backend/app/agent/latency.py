@@ -0,0 +1,73 @@
+# latency.py
+"""
+Rolling latency samples for agent tool calls and LLM runs.
+Keeps the last N samples per operation in memory so p50/p95 can be read
+without an external metrics backend.
+"""
+
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Deque, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Per-operation rolling window of latency samples in milliseconds."""
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = Lock()
+
+    def record(self, operation: str, latency_ms: float) -> None:
+        with self._lock:
+            samples = self._samples.get(operation)
+            if samples is None:
+                samples = self._samples[operation] = deque(maxlen=self.window)
+            samples.append(latency_ms)
+
+    @contextmanager
+    def measure(self, operation: str, **fields: Any) -> Iterator[None]:
+        """Time the enclosed block, record it, and log a structured latency event."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            self.record(operation, latency_ms)
+            logger.info(
+                "event=%s latency_ms=%.1f %s",
+                operation,
+                latency_ms,
+                " ".join(f"{key}={value}" for key, value in fields.items()),
+            )
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {op: sorted(samples) for op, samples in self._samples.items()}
+
+        def percentile(values, pct):
+            return values[min(len(values) - 1, int(pct * len(values)))]
+
+        return {
+            op: {
+                "count": len(values),
+                "p50_ms": percentile(values, 0.50),
+                "p95_ms": percentile(values, 0.95),
+                "max_ms": values[-1],
+            }
+            for op, values in snapshot.items()
+            if values
+        }
+
+
+latency_tracker = LatencyTracker()
+
+
+def get_latency_stats() -> Dict[str, Dict[str, float]]:
+    """Return p50/p95/max latency per recorded operation."""
+    return latency_tracker.stats()
@@ -0,0 +1,205 @@
+# query_cache.py
+"""
+In-memory caches for vector search tool results.
+Repeated searches from the ReAct loop are served from memory instead of
+re-embedding the query and round-tripping to Pinecone: QueryCache matches the
+normalized query string exactly, SemanticCache matches near-duplicate queries
+by embedding similarity.
+"""
+
+import time
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+
+class QueryCache:
+    """Thread-safe LRU cache with per-entry TTL expiration."""
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 300.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, value = entry
+            if time.monotonic() - stored_at >= self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class SemanticCache:
+    """Per-key ring buffer of (query embedding -> formatted result) pairs.
+
+    A lookup returns the stored result of the most similar prior query when its
+    cosine similarity reaches the threshold, so paraphrased agent searches skip
+    Pinecone. Each buffer holds at most max_size entries; when full, an expired
+    slot is reused first, otherwise the least recently used one is overwritten.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 6 * 3600.0, threshold: float = 0.92):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._buffers: Dict[Hashable, "_EmbeddingBuffer"] = {}
+        self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, key: Hashable, embedding: Sequence[float]) -> Optional[str]:
+        """Return the result cached for the closest live query under key, if similar enough."""
+        query = self._normalize(embedding)
+        with self._lock:
+            buffer = self._buffers.get(key)
+            hit = buffer.lookup(query, self.threshold, self.ttl_seconds) if buffer else None
+            if hit is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return hit
+
+    def set(self, key: Hashable, embedding: Sequence[float], result: str) -> None:
+        query = self._normalize(embedding)
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None or buffer.dim != query.shape[0]:
+                buffer = self._buffers[key] = _EmbeddingBuffer(self.max_size, query.shape[0])
+            buffer.insert(query, result, self.ttl_seconds)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buffers.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": sum(buffer.size for buffer in self._buffers.values()),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class _EmbeddingBuffer:
+    """Preallocated embedding matrix with parallel timestamp and result arrays."""
+
+    def __init__(self, capacity: int, dim: int):
+        self.dim = dim
+        self.size = 0
+        self.embeddings = np.zeros((capacity, dim), dtype=np.float32)
+        self.stored_at = np.zeros(capacity, dtype=np.float64)
+        self.last_used = np.zeros(capacity, dtype=np.float64)
+        self.results: List[Optional[str]] = [None] * capacity
+
+    def lookup(self, query: np.ndarray, threshold: float, ttl_seconds: float) -> Optional[str]:
+        if not self.size:
+            return None
+        now = time.monotonic()
+        sims = self.embeddings[: self.size] @ query
+        sims[now - self.stored_at[: self.size] >= ttl_seconds] = -np.inf
+        best = int(np.argmax(sims))
+        if sims[best] < threshold:
+            return None
+        self.last_used[best] = now
+        return self.results[best]
+
+    def insert(self, query: np.ndarray, result: str, ttl_seconds: float) -> None:
+        now = time.monotonic()
+        if self.size < len(self.results):
+            slot = self.size
+            self.size += 1
+        else:
+            # The oldest entry is expired whenever any is; only evict a live entry if none are
+            slot = int(np.argmin(self.stored_at))
+            if now - self.stored_at[slot] < ttl_seconds:
+                slot = int(np.argmin(self.last_used))
+        self.embeddings[slot] = query
+        self.stored_at[slot] = now
+        self.last_used[slot] = now
+        self.results[slot] = result
+
+
+# One exact-match cache per Pinecone namespace (plus "search_all"), so a burst of
+# searches against one source cannot evict the hot entries of another
+_search_caches: Dict[str, QueryCache] = {}
+_search_caches_lock = RLock()
+
+
+def get_search_cache(namespace: str) -> QueryCache:
+    """Return the exact-match result cache for a namespace, creating it on first use."""
+    cache = _search_caches.get(namespace)
+    if cache is None:
+        with _search_caches_lock:
+            cache = _search_caches.setdefault(
+                namespace, QueryCache(max_size=512, ttl_seconds=300.0)
+            )
+    return cache
+
+
+semantic_cache = SemanticCache(max_size=1024, ttl_seconds=6 * 3600.0, threshold=0.92)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different strings share a cache entry."""
+    return " ".join(query.split()).lower()
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters for the exact and semantic search tool caches."""
+    with _search_caches_lock:
+        exact = {namespace: cache.stats() for namespace, cache in _search_caches.items()}
+    return {"exact": exact, "semantic": semantic_cache.stats()}
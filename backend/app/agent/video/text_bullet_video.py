@@ -1,12 +1,24 @@
 import json
 import numpy as np
 from manim import *
-from gtts import gTTS
+import logging
 import os
-import cloudinary
-import cloudinary.uploader
+import hashlib
+import multiprocessing
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 import app.constants as constants
 
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used instead
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
 def upload_to_cloudinary(video_path):
     """
     Upload video to Cloudinary and return the shareable link.
@@ -17,6 +29,10 @@ def upload_to_cloudinary(video_path):
     - Better video optimization and delivery
     - More reliable CDN
     """
+    # Only the upload path needs the Cloudinary SDK
+    import cloudinary
+    import cloudinary.uploader
+
     try:
         # Configure cloudinary
         cloudinary.config(
@@ -25,11 +41,13 @@ def upload_to_cloudinary(video_path):
             api_secret=constants.CLOUDINARY_API_SECRET
         )
         
-        print(f"Uploading {video_path} to Cloudinary...")
+        logger.info("Uploading %s to Cloudinary", video_path)
         
         # Upload video with optimization settings
-        result = cloudinary.uploader.upload(
+        # Chunked upload: bounded memory, and a dropped connection only retries one chunk
+        result = cloudinary.uploader.upload_large(
             video_path,
+            chunk_size=20 * 1024 * 1024,
             resource_type="video",
             public_id=f"generated_video_{os.path.splitext(os.path.basename(video_path))[0]}",
             folder="educational_videos",
@@ -43,64 +61,164 @@ def upload_to_cloudinary(video_path):
         
         if result and result.get('secure_url'):
             link = result['secure_url']
-            print(f"✅ Upload successful! Link: {link}")
+            logger.info("Upload successful: %s", link)
             return link
         else:
-            print(f"❌ Upload failed: {result}")
+            logger.error("Cloudinary upload failed: %s", result)
             return None
             
-    except Exception as e:
-        print(f"❌ Error uploading to Cloudinary: {str(e)}")
+    except Exception:
+        logger.exception("Error uploading %s to Cloudinary", video_path)
         return None
 
-class TextBulletVideo(Scene):
-    def construct(self):
-        # This will be dynamically set by the JSON data
-        pass
-
-def create_text_bullet_video_from_json(json_file_path, output_filename="text_bullet_video.mp4", upload_to_cloudinary_flag=True):
+def media_duration(path):
     """
-    Creates a video with narration and animated bullet points from a JSON script file
+    Duration in seconds of a media file, read from its container header (0.0 if no duration is recorded)
     """
-    # Load the JSON script
-    with open(json_file_path, 'r') as f:
-        script_data = json.load(f)
-    
-    # Generate audio narration
-    audio_filename = None
-    if "audio" in script_data and "narration" in script_data["audio"]:
-        tts = gTTS(
-            text=script_data["audio"]["narration"], 
-            lang=script_data["audio"].get("language", "en")
+    import av
+
+    with av.open(path) as container:
+        if container.duration is not None:
+            return container.duration / av.time_base
+        return max(
+            (float(stream.duration * stream.time_base) for stream in container.streams if stream.duration),
+            default=0.0,
         )
-        audio_filename = "temp_narration.mp3"
-        tts.save(audio_filename)
-    
-    # Create a temporary Python file for manim
-    temp_scene_file = "temp_text_scene.py"
-    
-    scene_code = f'''
-import json
-import numpy as np
-from manim import *
+
+def run_ffmpeg(*args):
+    """
+    Run the ffmpeg binary bundled with imageio-ffmpeg, raising on failure
+    """
+    import imageio_ffmpeg
+
+    subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error", *args], check=True)
+
+def cached_video_url(render_id):
+    """
+    Cloudinary URL of a previously uploaded render with this id, or None
+    """
+    try:
+        with open(os.path.join(constants.VIDEO_URL_CACHE_DIR, f"{render_id}.url")) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def remember_video_url(render_id, url):
+    """
+    Record the uploaded URL so an identical script is never rendered again
+    """
+    try:
+        os.makedirs(constants.VIDEO_URL_CACHE_DIR, exist_ok=True)
+        path = os.path.join(constants.VIDEO_URL_CACHE_DIR, f"{render_id}.url")
+        partial_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        with open(partial_path, "w") as f:
+            f.write(url)
+        os.replace(partial_path, path)
+    except OSError as e:
+        logger.warning("Could not cache video URL for %s: %s", render_id, e)
+
+def upload_rendered_video(output_filename):
+    """
+    Upload a finished video and delete the local copy once it is on Cloudinary
+    """
+    cloudinary_link = upload_to_cloudinary(output_filename)
+    if cloudinary_link:
+        remember_video_url(os.path.splitext(os.path.basename(output_filename))[0], cloudinary_link)
+        # Delete local file after successful upload
+        try:
+            os.remove(output_filename)
+            logger.debug("Deleted local video %s after upload", output_filename)
+            return {"local_path": None, "cloudinary_link": cloudinary_link}
+        except Exception as e:
+            logger.warning("Could not delete local file %s: %s", output_filename, e)
+            return {"local_path": output_filename, "cloudinary_link": cloudinary_link}
+    else:
+        logger.warning("Upload failed, but video is available locally at %s", output_filename)
+        return {"local_path": output_filename, "cloudinary_link": None}
+
+def synthesize_narration(narration, language="en"):
+    """
+    Return the path of an MP3 of the narration, calling gTTS only on a cache miss.
+    Files are keyed by SHA-256 of (narration, language) so retries and re-renders reuse them.
+    """
+    digest = hashlib.sha256(f"{narration}|{language}".encode()).hexdigest()
+    os.makedirs(constants.TTS_CACHE_DIR, exist_ok=True)
+    path = os.path.join(constants.TTS_CACHE_DIR, f"{digest}.mp3")
+
+    if os.path.exists(path):
+        os.utime(path)  # mark as recently used for pruning
+        return path
+
+    # Write under a temp name so a concurrent render never reads a half-written file
+    partial_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    from gtts import gTTS
+
+    gTTS(text=narration, lang=language).save(partial_path)
+    os.replace(partial_path, path)
+    _prune_tts_cache()
+    return path
+
+def _prune_tts_cache():
+    """Delete least recently used narrations until the cache fits TTS_CACHE_MAX_MB."""
+    entries = []
+    for entry in os.scandir(constants.TTS_CACHE_DIR):
+        if entry.name.endswith(".mp3"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    limit = constants.TTS_CACHE_MAX_MB * 1024 * 1024
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+def bullet_positions(count, top=0.8, spacing=0.4):
+    """
+    Centre points for count bullets, stacked downward from top: one (count, 3) array
+    computed in a single vectorized step instead of a vector multiply per bullet
+    """
+    positions = np.zeros((count, 3))
+    positions[:, 1] = top - spacing * np.arange(count)
+    return positions
 
 class TextBulletScene(Scene):
+    """
+    Title followed by bullet points that appear and highlight one at a time.
+
+    With segment set, only one slice of the animation is rendered: segment 0 is the
+    title, segment i is bullet i (drawn over the title and earlier bullets, which are
+    added already finished). Concatenated in order, the segments match the full scene.
+    """
+
+    def __init__(self, script_data, segment=None, **kwargs):
+        self.script_data = script_data
+        self.segment = segment
+        super().__init__(**kwargs)
+
     def construct(self):
-        script_data = {json.dumps(script_data, indent=2)}
+        script_data = self.script_data
         
         # Create title
         title = Text(script_data["title"], font_size=36, color=WHITE)
         title.move_to(UP * 2.5)
-        self.play(Write(title))
-        self.wait(1)
+        segment = self.segment
+        if segment is None or segment == 0:
+            self.play(Write(title))
+            self.wait(1)
         
         # Get bullet points and timing
         bullets = script_data["bullets"]
-        timing = script_data.get("timing", {{}})
+        timing = script_data.get("timing", {})
         
         # Create bullet points with text wrapping
         bullet_objects = []
         max_chars_per_line = 60  # Maximum characters per line
+        positions = bullet_positions(len(bullets))
         
         for i, bullet in enumerate(bullets):
             bullet_content = bullet['text']
@@ -124,18 +242,26 @@ class TextBulletScene(Scene):
                     lines.append(current_line)
                 
                 # Create multi-line bullet text with proper alignment
-                bullet_text_content = "• " + lines[0] + ("\\n  " + "\\n  ".join(lines[1:]) if len(lines) > 1 else "")
+                bullet_text_content = "• " + lines[0] + ("\n  " + "\n  ".join(lines[1:]) if len(lines) > 1 else "")
             else:
-                bullet_text_content = f"• {{bullet_content}}"
+                bullet_text_content = f"• {bullet_content}"
             
             bullet_text = Text(bullet_text_content, font_size=24, color=WHITE)
             # Better positioning: start below title and use much tighter spacing
-            bullet_text.move_to(UP * (0.8 - i * 0.4))
+            bullet_text.move_to(positions[i])
             bullet_text.align_to(LEFT * 3, LEFT)  # Align all bullets to the left
             bullet_objects.append(bullet_text)
         
+        if segment is None:
+            animated = bullet_objects
+        elif segment == 0:
+            animated = []
+        else:
+            self.add(title, *bullet_objects[:segment - 1])
+            animated = bullet_objects[segment - 1:segment]
+
         # Animate bullet points appearing one by one
-        for i, bullet_obj in enumerate(bullet_objects):
+        for bullet_obj in animated:
             # Highlight effect - make it yellow briefly, then white
             bullet_obj.set_color(YELLOW)
             self.play(
@@ -152,89 +278,139 @@ class TextBulletScene(Scene):
             self.wait(timing.get("pause_between_bullets", 0.5))
         
         # Keep all bullets visible for final pause
-        self.wait(timing.get("final_pause", 2.0))
-'''
+        if segment is None or segment == len(bullet_objects):
+            self.wait(timing.get("final_pause", 2.0))
+
+# manim's config is process-global, so in-process renders take turns; narration,
+# muxing and upload still overlap between concurrent video jobs
+_render_lock = threading.Lock()
+
+def render_scene(script_data, render_id, segment=None):
+    """
+    Render TextBulletScene (or one segment of it) in this process and return the path
+    of the silent 720p24 video
+    """
+    output_file = render_id if segment is None else f"{render_id}_part{segment}"
+    with _render_lock, tempconfig({
+        "quality": "medium_quality",
+        # 24 fps is plenty for text animations and a fifth fewer frames than 30
+        "frame_rate": 24,
+        "output_file": output_file,
+        "progress_bar": "none",
+        "verbosity": "WARNING",
+    }):
+        scene = TextBulletScene(script_data, segment=segment)
+        scene.render()
+        return str(scene.renderer.file_writer.movie_file_path)
+
+@lru_cache(maxsize=1)
+def _segment_pool():
+    """
+    Long-lived renderer processes, so each pays manim's import once rather than per video.
+    Spawned, not forked: the parent is a threaded web server.
+    """
+    return ProcessPoolExecutor(
+        max_workers=constants.VIDEO_RENDER_PROCESSES,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+def render_video(script_data, render_id):
+    """
+    Render the silent video, splitting it into title/per-bullet segments rendered in
+    parallel processes when VIDEO_RENDER_PROCESSES allows, then joining them losslessly
+    """
+    segment_count = len(script_data["bullets"]) + 1
+    if constants.VIDEO_RENDER_PROCESSES < 2 or segment_count < 3:
+        return render_scene(script_data, render_id)
+
+    segment_paths = list(_segment_pool().map(
+        render_scene, repeat(script_data), repeat(render_id), range(segment_count)
+    ))
+
+    # Every segment comes out of the same encoder settings, so the concat demuxer can
+    # join them with a stream copy
+    output_path = os.path.join(os.path.dirname(segment_paths[0]), f"{render_id}.mp4")
+    list_path = f"{output_path}.txt"
+    with open(list_path, "w") as f:
+        f.writelines(f"file '{os.path.abspath(path)}'\n" for path in segment_paths)
+    try:
+        run_ffmpeg("-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", output_path)
+    finally:
+        for path in (list_path, *segment_paths):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return output_path
+
+def create_text_bullet_video_from_json(json_file_path, output_filename="text_bullet_video.mp4", upload_to_cloudinary_flag=True):
+    """
+    Creates a video with narration and animated bullet points from a JSON script file
+    """
+    with open(json_file_path, 'rb') as f:
+        script_data = orjson.loads(f.read()) if orjson is not None else json.load(f)
+    return create_text_bullet_video_from_dict(script_data, output_filename, upload_to_cloudinary_flag)
+
+def create_text_bullet_video_from_dict(script_data, output_filename="text_bullet_video.mp4", upload_to_cloudinary_flag=True):
+    """
+    Creates a video with narration and animated bullet points from an in-memory script dict
+    """
+    # Manim output is named after the output file so concurrent renders don't collide
+    render_id = os.path.splitext(os.path.basename(output_filename))[0]
+
+    # Generate audio narration (served from the on-disk TTS cache when already synthesized)
+    audio_filename = None
+    if "audio" in script_data and "narration" in script_data["audio"]:
+        audio_filename = synthesize_narration(
+            script_data["audio"]["narration"],
+            script_data["audio"].get("language", "en")
+        )
     
-    # Write the temporary scene file
-    with open(temp_scene_file, 'w') as f:
-        f.write(scene_code)
+    # Render the video in-process or in parallel segments (no manim CLI subprocess per video)
+    rendered_path = render_video(script_data, render_id)
     
-    try:
-        # Render the video using manim
-        os.system(f"manim -qm {temp_scene_file} TextBulletScene")
+    if os.path.exists(rendered_path):
+        # If we have audio, combine it with the video
+        has_audio = audio_filename and os.path.exists(audio_filename)
+        overrun = media_duration(audio_filename) - media_duration(rendered_path) if has_audio else 0
+        if has_audio and overrun <= 0:
+            # Common case: narration fits in the animation. Copy the H.264 stream as-is and
+            # pad the narration with silence, in one ffmpeg pass with no re-encode.
+            run_ffmpeg(
+                "-i", rendered_path, "-i", audio_filename,
+                "-filter_complex", "[1:a]apad[a]",
+                "-map", "0:v", "-map", "[a]",
+                "-c:v", "copy", "-c:a", "aac", "-shortest",
+                "-movflags", "+faststart",
+                output_filename
+            )
+        elif has_audio:
+            # Narration runs past the animation: hold the last frame for the difference.
+            # tpad needs decoded frames, so this path re-encodes the video.
+            run_ffmpeg(
+                "-i", rendered_path, "-i", audio_filename,
+                "-filter_complex", f"[0:v]tpad=stop_mode=clone:stop_duration={overrun:.3f}[v]",
+                "-map", "[v]", "-map", "1:a",
+                # Flat text on a dark background: a fast preset and CRF 28 are visually
+                # lossless here and keep the upload small
+                "-c:v", "libx264", "-preset", "veryfast", "-crf", "28", "-c:a", "aac",
+                "-movflags", "+faststart",
+                output_filename
+            )
+        else:
+            # Silent video: take manim's file as the output instead of copying it
+            os.replace(rendered_path, output_filename)
         
-        # The rendered video will be in media/videos/temp_text_scene/720p30/TextBulletScene.mp4
-        rendered_path = "media/videos/temp_text_scene/720p30/TextBulletScene.mp4"
+        logger.info("Video created: %s", output_filename)
         
-        if os.path.exists(rendered_path):
-            # If we have audio, combine it with the video
-            if audio_filename and os.path.exists(audio_filename):
-                from moviepy import VideoFileClip, AudioFileClip, CompositeAudioClip
-                
-                video_clip = VideoFileClip(rendered_path)
-                audio_clip = AudioFileClip(audio_filename)
-                
-                # Extend the shorter one to match the longer duration
-                if video_clip.duration < audio_clip.duration:
-                    # Extend video by freezing the last frame
-                    from moviepy import ImageClip
-                    last_frame = video_clip.get_frame(video_clip.duration)
-                    freeze_frame = ImageClip(last_frame, duration=audio_clip.duration - video_clip.duration)
-                    from moviepy import concatenate_videoclips
-                    video_clip = concatenate_videoclips([video_clip, freeze_frame])
-                elif audio_clip.duration < video_clip.duration:
-                    # Extend audio by adding silence
-                    from moviepy import AudioArrayClip
-                    import numpy as np
-                    silence_duration = video_clip.duration - audio_clip.duration
-                    silence = AudioArrayClip(np.zeros((int(silence_duration * audio_clip.fps), audio_clip.nchannels)), 
-                                           fps=audio_clip.fps)
-                    from moviepy import concatenate_audioclips
-                    audio_clip = concatenate_audioclips([audio_clip, silence])
-                # If durations are equal, no adjustment needed
-                
-                final_video = video_clip.with_audio(audio_clip)
-                final_video.write_videofile(output_filename, codec='libx264', audio_codec='aac')
-                
-                # Clean up
-                video_clip.close()
-                audio_clip.close()
-                final_video.close()
-            else:
-                # Just copy the rendered video
-                import shutil
-                shutil.copy(rendered_path, output_filename)
-            
-            print(f"Video created successfully: {output_filename}")
-            
-            # Upload to Cloudinary if requested
-            if upload_to_cloudinary_flag:
-                cloudinary_link = upload_to_cloudinary(output_filename)
-                if cloudinary_link:
-                    print(f"🔗 Shareable link: {cloudinary_link}")
-                    # Delete local file after successful upload
-                    try:
-                        os.remove(output_filename)
-                        print(f"🗑️ Local video file deleted after successful upload")
-                        return {"local_path": None, "cloudinary_link": cloudinary_link}
-                    except Exception as e:
-                        print(f"⚠️ Warning: Could not delete local file {output_filename}: {str(e)}")
-                        return {"local_path": output_filename, "cloudinary_link": cloudinary_link}
-                else:
-                    print("Upload failed, but video is available locally")
-                    return {"local_path": output_filename, "cloudinary_link": None}
-            else:
-                return {"local_path": output_filename, "cloudinary_link": None}
+        # Upload to Cloudinary if requested
+        if upload_to_cloudinary_flag:
+            return upload_rendered_video(output_filename)
         else:
-            print("Error: Rendered video not found")
-            return None
-    
-    finally:
-        # Clean up temporary files
-        if os.path.exists(temp_scene_file):
-            os.remove(temp_scene_file)
-        if audio_filename and os.path.exists(audio_filename):
-            os.remove(audio_filename)
+            return {"local_path": output_filename, "cloudinary_link": None}
+    else:
+        logger.error("Rendered video not found for %s", output_filename)
+        return None
 
 
 # Example usage
@@ -0,0 +1,136 @@
+# video_jobs.py
+"""
+Background rendering for educational videos.
+Renders run on a small thread pool so the agent (and its HTTP worker) is not
+blocked on manim, ffmpeg and the Cloudinary upload; callers get a job id back
+and poll for the final video URL.
+"""
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rendering is CPU-heavy; two workers let a lesson's two videos render side by side.
+# Uploads are network-bound and run on their own pool, so a render worker moves on
+# to the next video instead of waiting on Cloudinary.
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="video-render")
+_upload_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="video-upload")
+_jobs: Dict[str, Dict[str, Any]] = {}
+_lock = Lock()
+
+
+def submit_video_job(
+    job_id: str,
+    title: str,
+    render: Callable[..., Optional[dict]],
+    *args,
+    upload: Optional[Callable[[str], Optional[dict]]] = None,
+    **kwargs,
+) -> str:
+    """Queue render(*args, **kwargs) under job_id; resubmitting a live or finished id is a no-op.
+
+    When upload is given, it is called with the rendered local_path on the upload pool
+    and its result becomes the job result.
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is not None and not _failed(job["future"]):
+            return job_id
+        future = _executor.submit(render, *args, **kwargs)
+        if upload is not None:
+            future = _then_upload(future, upload)
+        future.add_done_callback(lambda done: _log_failure(job_id, done))
+        _jobs[job_id] = {"title": title, "future": future}
+    logger.info("Queued video job %s (%r)", job_id, title)
+    return job_id
+
+
+def get_video_future(job_id: str) -> Optional[Future]:
+    with _lock:
+        job = _jobs.get(job_id)
+    return job["future"] if job else None
+
+
+def video_job_status(job_id: str) -> Dict[str, Any]:
+    """Describe a job in the same shape create_educational_video used to return synchronously."""
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        return {"status": "error", "job_id": job_id, "error": f"Unknown video job: {job_id}"}
+
+    title, future = job["title"], job["future"]
+    if not future.done():
+        return {"status": "pending", "job_id": job_id, "title": title}
+
+    try:
+        result = future.result()
+    except Exception as e:
+        # Already logged with its traceback by _log_failure; polls just report it
+        return {"status": "error", "job_id": job_id, "error": f"Error creating video: {str(e)}"}
+
+    if result and result.get("cloudinary_link"):
+        return {
+            "status": "success",
+            "job_id": job_id,
+            "video_url": result["cloudinary_link"],
+            "local_path": result.get("local_path"),  # Will be None if deleted after upload
+            "title": title,
+            "message": "Video uploaded to Cloudinary and local file cleaned up" if not result.get("local_path") else "Video uploaded to Cloudinary"
+        }
+    if result and result.get("local_path"):
+        return {
+            "status": "partial_success",
+            "job_id": job_id,
+            "video_url": None,
+            "local_path": result.get("local_path"),
+            "error": "Upload failed",
+            "title": title
+        }
+    return {
+        "status": "error",
+        "job_id": job_id,
+        "error": "Video generation failed. Please check the inputs and try again."
+    }
+
+
+def _then_upload(rendered: Future, upload: Callable[[str], Optional[dict]]) -> Future:
+    """Future for the upload stage, started on the upload pool once rendering finishes."""
+    uploaded: Future = Future()
+
+    def resolve(stage: Future) -> None:
+        if stage.exception() is not None:
+            uploaded.set_exception(stage.exception())
+        else:
+            uploaded.set_result(stage.result())
+
+    def start_upload(render_future: Future) -> None:
+        if render_future.exception() is not None:
+            uploaded.set_exception(render_future.exception())
+            return
+        result = render_future.result()
+        if not (result and result.get("local_path")):
+            uploaded.set_result(result)
+            return
+        _upload_executor.submit(upload, result["local_path"]).add_done_callback(resolve)
+
+    rendered.add_done_callback(start_upload)
+    return uploaded
+
+
+def _log_failure(job_id: str, future: Future) -> None:
+    """Done-callback: log a failed job's traceback once, when it fails."""
+    error = future.exception()
+    if error is not None:
+        logger.error("Video job %s failed", job_id, exc_info=error)
+
+
+def _failed(future: Future) -> bool:
+    if not future.done():
+        return False
+    if future.exception() is not None:
+        return True
+    result = future.result()
+    return not (result and (result.get("cloudinary_link") or result.get("local_path")))
@@ -2,52 +2,444 @@
 Linear API client for fetching tickets and team information.
 """
 
-from typing import List, Dict, Any
+import asyncio
+import importlib.util
+import json
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import AsyncIterator, List, Dict, Any, ClassVar, Final, Literal, Mapping, Optional, Tuple, TypedDict
 import aiohttp
+import httpx
 import app.constants as constants
 
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used instead
+    orjson = None
+
+# httpx speaks HTTP/2 only with the optional h2 package
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+logger = logging.getLogger(__name__)
+
+
+class LinearName(TypedDict, total=False):
+    name: Optional[str]
+
+
+class LinearPerson(TypedDict, total=False):
+    name: Optional[str]
+    email: Optional[str]
+
+
+class LinearLabels(TypedDict, total=False):
+    nodes: List[LinearName]
+
+
+class LinearTicket(TypedDict, total=False):
+    """An issue as selected by IssueFields; optional fields may be absent or null."""
+
+    id: str
+    identifier: str
+    title: str
+    description: Optional[str]
+    url: str
+    state: LinearName
+    priority: Optional[float]
+    estimate: Optional[float]
+    labels: Optional[LinearLabels]
+    assignee: Optional[LinearPerson]
+    creator: Optional[LinearPerson]
+    createdAt: str
+    updatedAt: str
+    completedAt: Optional[str]
+    project: Optional[LinearName]
+
+
+# GraphQL responses shared by every client in the process, keyed by
+# (api key, query, variables) -> (fetched_at, data); least recently used dropped first.
+# Clients run on several event loops and worker threads, so every access holds the lock.
+_RESPONSE_CACHE_SIZE: Final[int] = 256
+_response_cache: "OrderedDict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+def _json_dumps(value: Any, sort_keys: bool = False) -> str:
+    """Serialize request bodies (and cache keys) with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS if sort_keys else 0).decode()
+    return json.dumps(value, sort_keys=sort_keys)
+
+
+_GET_TEAM_IDS_QUERY: Final[str] = """
+query GetTeamIds {
+  teams {
+    nodes {
+      id
+      name
+    }
+  }
+}
+"""
+
+# Indexed ticket text, one template per (has completedAt, has description)
+_CONTENT_HEAD: Final[str] = (
+    "Ticket: {identifier} - {title}\n"
+    "Status: {state}\n"
+    "Priority: {priority}\n"
+    "Estimate: {estimate}\n"
+    "Project: {project}\n"
+    "Assignee: {assignee}\n"
+    "Creator: {creator}\n"
+    "Labels: {labels}\n"
+    "Created: {created}\n"
+    "Updated: {updated}"
+)
+_CONTENT_TEMPLATES: Final[Dict[Tuple[bool, bool], str]] = {
+    (False, False): _CONTENT_HEAD + "\n\nURL: {url}",
+    (True, False): _CONTENT_HEAD + "\nCompleted: {completed}\n\nURL: {url}",
+    (False, True): _CONTENT_HEAD + "\n\nDescription:\n{description}\n\nURL: {url}",
+    (True, True): _CONTENT_HEAD + "\nCompleted: {completed}\n\nDescription:\n{description}\n\nURL: {url}",
+}
+
+# Connection-level failures retried like 5xx responses, for either transport
+_TRANSIENT_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError, httpx.TransportError)
+
+# Lower bound for teams with no recorded sync, so one query shape serves every team
+_EPOCH: Final[str] = "1970-01-01T00:00:00.000Z"
+
+# Transient responses worth retrying: rate limiting and gateway/upstream failures
+_RETRY_STATUSES: Final[frozenset] = frozenset({429, 500, 502, 503, 504})
+
+# Teams per aliased ticket query; keeps each request under Linear's query complexity limit
+_TEAMS_PER_REQUEST: Final[int] = 5
+
+# Selection shared by every ticket query; description and labels are optional
+# because they are the bulk of each issue and not every caller reads them
+_ISSUE_BASE_FIELDS = """
+  id
+  identifier
+  title
+  url
+  state {
+    name
+  }
+  priority
+  estimate
+  assignee {
+    name
+    email
+  }
+  creator {
+    name
+    email
+  }
+  createdAt
+  updatedAt
+  completedAt
+  project {
+    name
+  }
+"""
+_ISSUE_DESCRIPTION_FIELD = "  description\n"
+_ISSUE_LABEL_FIELDS = """  labels {
+    nodes {
+      name
+    }
+  }
+"""
+
+
+@lru_cache(maxsize=64)
+def _team_tickets_query(
+    team_count: int,
+    include_description: bool = True,
+    include_labels: bool = True,
+    paginated: bool = False,
+    since: bool = False,
+) -> str:
+    """GraphQL document fetching in-progress/cancelled/shipped issues for team_count teams.
+
+    paginated adds an $after cursor and pageInfo, for walking one team page by page.
+    since adds a per-team $s<i> bound so only issues updated after it are returned.
+    Each distinct shape is built once and reused.
+    """
+    variables = ", ".join(f"$t{i}: String!" for i in range(team_count))
+    if since:
+        variables += "".join(f", $s{i}: DateTimeOrDuration!" for i in range(team_count))
+    if paginated:
+        variables += ", $after: String"
+    after = "\n      after: $after" if paginated else ""
+    page_info = "\n      pageInfo {\n        hasNextPage\n        endCursor\n      }" if paginated else ""
+    teams = "\n".join(
+        f"""  t{i}: team(id: $t{i}) {{
+    issues(
+      filter: {{ state: {{ name: {{ in: ["In Progress", "Cancelled", "Done", "Shipped"] }} }}{f", updatedAt: {{ gt: $s{i} }}" if since else ""} }}
+      first: $first{after}
+    ) {{
+      nodes {{
+        ...IssueFields
+      }}{page_info}
+    }}
+  }}"""
+        for i in range(team_count)
+    )
+    issue_fields = (
+        "fragment IssueFields on Issue {"
+        + _ISSUE_BASE_FIELDS
+        + (_ISSUE_DESCRIPTION_FIELD if include_description else "")
+        + (_ISSUE_LABEL_FIELDS if include_labels else "")
+        + "}\n"
+    )
+    return f"query GetTeamTickets($first: Int!, {variables}) {{\n{teams}\n}}\n{issue_fields}"
+
+
+def _person_info(person: LinearPerson, missing: str) -> str:
+    """Format an assignee/creator as "Name (email)", or return missing when unset."""
+    if not person:
+        return missing
+    name = person.get("name", "Unknown")
+    email = person.get("email")
+    return f"{name} ({email})" if email else name
+
+
+def latest_updated_at(tickets_by_team: Dict[str, List[LinearTicket]]) -> Dict[str, str]:
+    """Newest updatedAt per team, to pass back as since on the next fetch.
+
+    Teams without tickets are left out. Linear timestamps are uniform ISO-8601 UTC
+    strings, so string order is time order.
+    """
+    return {
+        team_id: max(ticket["updatedAt"] for ticket in tickets)
+        for team_id, tickets in tickets_by_team.items()
+        if tickets
+    }
+
+
+class _TokenBucket:
+    """Client-side request limiter: bursts up to rate requests, then rate per second.
+
+    A request that finds the bucket empty takes a token on credit and sleeps until
+    it would have been refilled, so concurrent callers queue in arrival order.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            await asyncio.sleep(wait)
+
+
+_limiters: Dict[Tuple[str, float], _TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def _limiter_for(api_key: str, rate: float) -> _TokenBucket:
+    with _limiters_lock:
+        limiter = _limiters.get((api_key, rate))
+        if limiter is None:
+            limiter = _limiters[api_key, rate] = _TokenBucket(rate)
+        return limiter
+
 
 class LinearClient:
-    def __init__(self, api_key: str = None):
+    """Linear GraphQL client holding one keep-alive HTTP session for its lifetime.
+
+    pool_size caps concurrent connections to api.linear.app. It should cover the
+    widest fan-out callers run (parallel team fetches); a larger pool only costs
+    idle sockets, a smaller one queues requests behind each other. Timeouts keep a
+    stalled request from holding a pool slot indefinitely.
+
+    Use it as an async context manager, or call aclose() when done, to release
+    the pooled connections.
+    """
+
+    # Shared by every client; ticket formatting is short CPU-bound work
+    _executor: ClassVar[ThreadPoolExecutor] = ThreadPoolExecutor(
+        max_workers=4, thread_name_prefix="linear-process"
+    )
+
+    def __init__(
+        self,
+        api_key: str = None,
+        pool_size: int = 64,
+        cache_ttl_s: float = 60.0,
+        stale_if_error: bool = True,
+        max_retries: int = 3,
+        base_backoff: float = 0.5,
+        transport: Literal["aiohttp", "httpx"] = "aiohttp",
+        requests_per_second: float = 50.0,
+    ):
         self.api_key = api_key or constants.LINEAR_API_KEY
         self.base_url = "https://api.linear.app/graphql"
+        self.pool_size = pool_size
+        # Default lifetime of cached responses (0 disables caching); with stale_if_error
+        # an expired response is served when Linear is unreachable or erroring
+        self.cache_ttl_s = cache_ttl_s
+        self.stale_if_error = stale_if_error
+        # Rate limits (429), gateway errors and dropped connections are retried with
+        # jittered exponential backoff, honoring Retry-After when Linear sends it
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        # "httpx" multiplexes concurrent requests over one HTTP/2 connection when the
+        # h2 package is installed (HTTP/1.1 keep-alive otherwise); aiohttp is HTTP/1.1
+        self.transport = transport
+        # Linear's limits are per API key, so clients sharing a key (at the same rate)
+        # share one bucket
+        self._limiter = _limiter_for(self.api_key, requests_per_second)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._httpx_client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> "LinearClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Create the shared session on first use (it must be built inside a running loop)."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={"Authorization": self.api_key, "Content-Type": "application/json"},
+                # Only one host is ever contacted, so the per-host limit is the pool size
+                connector=aiohttp.TCPConnector(
+                    limit=0, limit_per_host=self.pool_size, ttl_dns_cache=600, keepalive_timeout=75
+                ),
+                timeout=aiohttp.ClientTimeout(total=30, connect=5),
+                json_serialize=_json_dumps,
+            )
+        return self._session
+
+    def _get_httpx_client(self) -> httpx.AsyncClient:
+        """Create the shared httpx client on first use (httpx transport only)."""
+        if self._httpx_client is None or self._httpx_client.is_closed:
+            self._httpx_client = httpx.AsyncClient(
+                http2=_HTTP2_AVAILABLE,
+                headers={"Authorization": self.api_key, "Content-Type": "application/json"},
+                limits=httpx.Limits(
+                    max_connections=self.pool_size, max_keepalive_connections=self.pool_size
+                ),
+                timeout=httpx.Timeout(30.0, connect=5.0),
+            )
+        return self._httpx_client
+
+    async def _send(self, payload: Dict[str, Any]) -> Tuple[int, Mapping[str, str], bytes]:
+        """POST payload on the configured transport; returns (status, headers, body)."""
+        if self.transport == "httpx":
+            response = await self._get_httpx_client().post(
+                self.base_url, content=_json_dumps(payload).encode()
+            )
+            return response.status_code, response.headers, response.content
+
+        session = await self._get_session()
+        async with session.post(self.base_url, json=payload) as response:
+            return response.status, response.headers, await response.read()
+
+    async def aclose(self) -> None:
+        """Close the pooled connections; a later request opens a new session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._httpx_client is not None:
+            await self._httpx_client.aclose()
+        self._httpx_client = None
+
+    def invalidate(self) -> None:
+        """Drop every cached response fetched with this client's API key."""
+        with _response_cache_lock:
+            for key in [key for key in _response_cache if key[0] == self.api_key]:
+                del _response_cache[key]
 
     async def _make_request(
-        self, query: str, variables: Dict[str, Any] = None
+        self, query: str, variables: Dict[str, Any] = None, ttl: Optional[float] = None
     ) -> Dict[str, Any]:
-        """Make a GraphQL request to Linear API."""
-        headers = {"Authorization": self.api_key, "Content-Type": "application/json"}
+        """Make a GraphQL request to Linear API, served from cache within ttl seconds."""
+        ttl = self.cache_ttl_s if ttl is None else ttl
+        key = (self.api_key, query, _json_dumps(variables or {}, sort_keys=True))
+        with _response_cache_lock:
+            cached = _response_cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < ttl:
+                _response_cache.move_to_end(key)
+                return cached[1]
+
+        try:
+            data = await self._post(query, variables)
+        except Exception as e:
+            if cached is not None and self.stale_if_error:
+                logger.warning("Linear request failed (%s); serving cached response", e)
+                return cached[1]
+            raise
+
+        if ttl > 0:
+            with _response_cache_lock:
+                _response_cache[key] = (time.monotonic(), data)
+                _response_cache.move_to_end(key)
+                while len(_response_cache) > _RESPONSE_CACHE_SIZE:
+                    _response_cache.popitem(last=False)
+        return data
 
+    async def _post(self, query: str, variables: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         payload = {"query": query, "variables": variables or {}}
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                self.base_url, headers=headers, json=payload
-            ) as response:
-                if response.status != 200:
-                    raise Exception(f"Linear API request failed: {response.status}")
+        for attempt in range(self.max_retries + 1):
+            retry_after: Optional[str] = None
+            # Retries draw from the same budget as first attempts
+            await self._limiter.acquire()
+            try:
+                status, headers, body = await self._send(payload)
+            except _TRANSIENT_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                failure = repr(e)
+            else:
+                if status in _RETRY_STATUSES and attempt < self.max_retries:
+                    retry_after = headers.get("Retry-After")
+                    failure = f"status {status}"
+                else:
+                    if status != 200:
+                        raise Exception(f"Linear API request failed: {status}")
+
+                    data = orjson.loads(body) if orjson is not None else json.loads(body)
+
+                    if "errors" in data:
+                        raise Exception(f"Linear API errors: {data['errors']}")
 
-                data = await response.json()
+                    return data["data"]
 
-                if "errors" in data:
-                    raise Exception(f"Linear API errors: {data['errors']}")
+            delay = self._backoff(attempt, retry_after)
+            logger.warning(
+                "Linear request failed (%s); retry %d/%d in %.2fs",
+                failure, attempt + 1, self.max_retries, delay,
+            )
+            await asyncio.sleep(delay)
 
-                return data["data"]
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Seconds to wait before the next attempt: Retry-After if numeric, else exponential."""
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = self.base_backoff * 2 ** attempt
+        return delay + random.random() * 0.25
 
     async def get_team_ids(self) -> List[str]:
         """Get the team ID for the authenticated user."""
-        query = """
-        query GetTeamIds {
-          teams {
-            nodes {
-              id
-              name
-            }
-          }
-        }
-        """
-
-        data = await self._make_request(query)
+        # Team membership rarely changes; cache it longer unless caching is off
+        data = await self._make_request(_GET_TEAM_IDS_QUERY, ttl=600 if self.cache_ttl_s > 0 else 0)
         teams = data["teams"]["nodes"]
 
         if not teams:
@@ -57,146 +449,209 @@ class LinearClient:
         return [team["id"] for team in teams]
 
     async def fetch_team_tickets(
-        self, team_id: str, limit: int = 100
-    ) -> List[Dict[str, Any]]:
+        self,
+        team_id: str,
+        limit: int = 100,
+        include_description: bool = True,
+        include_labels: bool = True,
+    ) -> List[LinearTicket]:
         """Fetch tickets for a team with inprogress, cancelled, or shipped states."""
+        tickets = await self.fetch_all_team_tickets(
+            [team_id], limit, include_description, include_labels
+        )
+        return tickets[team_id]
 
-        query = """
-        query GetTeamTickets($teamId: String!, $first: Int!) {
-          team(id: $teamId) {
-            issues(
-              filter: {
-                state: {
-                  name: {
-                    in: ["In Progress", "Cancelled", "Done", "Shipped"]
-                  }
-                }
-              }
-              first: $first
-            ) {
-              nodes {
-                id
-                identifier
-                title
-                description
-                url
-                state {
-                  name
-                }
-                priority
-                estimate
-                labels {
-                  nodes {
-                    name
-                  }
-                }
-                assignee {
-                  name
-                  email
-                }
-                creator {
-                  name
-                  email
-                }
-                createdAt
-                updatedAt
-                completedAt
-                project {
-                  name
-                }
-              }
-            }
-          }
-        }
+    async def fetch_team_tickets_lite(
+        self, team_id: str, limit: int = 100
+    ) -> List[LinearTicket]:
+        """Fetch a team's tickets without descriptions or labels, for metadata-only callers."""
+        return await self.fetch_team_tickets(
+            team_id, limit, include_description=False, include_labels=False
+        )
+
+    async def fetch_all_team_tickets(
+        self,
+        team_ids: List[str],
+        limit: int = 100,
+        include_description: bool = True,
+        include_labels: bool = True,
+        since: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, List[LinearTicket]]:
+        """Fetch tickets for several teams, keyed by team id.
+
+        Teams are queried as aliased fields of one GraphQL document, so up to
+        _TEAMS_PER_REQUEST teams share a single round trip. With since (team id ->
+        ISO timestamp, e.g. from latest_updated_at), only tickets updated after that
+        team's timestamp are returned; teams missing from it are fetched in full.
         """
+        tickets: Dict[str, List[LinearTicket]] = {}
+        for start in range(0, len(team_ids), _TEAMS_PER_REQUEST):
+            batch = team_ids[start:start + _TEAMS_PER_REQUEST]
+            variables: Dict[str, Any] = {"first": limit}
+            for i, team_id in enumerate(batch):
+                variables[f"t{i}"] = team_id
+                if since is not None:
+                    variables[f"s{i}"] = since.get(team_id, _EPOCH)
+            data = await self._make_request(
+                _team_tickets_query(
+                    len(batch), include_description, include_labels, since=since is not None
+                ),
+                variables,
+            )
+            for i, team_id in enumerate(batch):
+                tickets[team_id] = data[f"t{i}"]["issues"]["nodes"]
+        return tickets
 
-        variables = {"teamId": team_id, "first": limit}
+    async def iter_team_tickets(
+        self,
+        team_id: str,
+        page_size: int = 50,
+        include_description: bool = True,
+        include_labels: bool = True,
+    ) -> AsyncIterator[LinearTicket]:
+        """Yield a team's tickets page by page, following Linear's cursor.
 
-        data = await self._make_request(query, variables)
-        return data["team"]["issues"]["nodes"]
+        Only one page is held at a time, and callers can process tickets while the
+        next page is requested.
+        """
+        query = _team_tickets_query(1, include_description, include_labels, paginated=True)
+        after: Optional[str] = None
+        while True:
+            data = await self._make_request(query, {"first": page_size, "t0": team_id, "after": after})
+            issues = data["t0"]["issues"]
+            for ticket in issues["nodes"]:
+                yield ticket
+            page_info = issues["pageInfo"]
+            if not page_info["hasNextPage"]:
+                break
+            after = page_info["endCursor"]
 
-    def process_ticket(self, ticket: Dict[str, Any]) -> tuple[str, Dict[str, Any]]:
+    async def fetch_tickets_for_teams(
+        self, team_ids: List[str], limit: int = 100, max_concurrency: int = 8
+    ) -> Dict[str, List[LinearTicket]]:
+        """Fetch each team's tickets in its own request, up to max_concurrency at a time.
+
+        Fallback for when the aliased batch query is rejected. Teams whose request
+        fails are logged and left out of the result.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch_one(team_id: str) -> Tuple[str, List[LinearTicket]]:
+            async with semaphore:
+                return team_id, await self.fetch_team_tickets(team_id, limit)
+
+        results = await asyncio.gather(
+            *(fetch_one(team_id) for team_id in team_ids), return_exceptions=True
+        )
+        tickets: Dict[str, List[LinearTicket]] = {}
+        for team_id, result in zip(team_ids, results):
+            if isinstance(result, BaseException):
+                logger.warning("Failed to fetch Linear tickets for team %s: %s", team_id, result)
+                continue
+            tickets[team_id] = result[1]
+        return tickets
+
+    def process_tickets(
+        self, tickets: List[LinearTicket]
+    ) -> tuple[List[str], List[Dict[str, Any]]]:
+        """Process a batch of tickets into parallel lists of contents and metadata."""
+        contents: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        process = self.process_ticket
+        for ticket in tickets:
+            content, metadata = process(ticket)
+            contents.append(content)
+            metadatas.append(metadata)
+        return contents, metadatas
+
+    async def process_tickets_async(
+        self, tickets: List[LinearTicket]
+    ) -> tuple[List[str], List[Dict[str, Any]]]:
+        """process_tickets on a worker thread, so the event loop keeps serving other
+        requests (and in-flight Linear responses) while a large batch is formatted."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.process_tickets, tickets
+        )
+
+    def process_ticket(self, ticket: LinearTicket) -> tuple[str, Dict[str, Any]]:
         """Process a ticket into content and metadata for indexing."""
+        identifier = ticket["identifier"]
+        title = ticket["title"]
+        state_name = ticket["state"]["name"]
+        url = ticket["url"]
+        created_at = ticket["createdAt"]
+        updated_at = ticket["updatedAt"]
+        priority = ticket.get("priority")
+        estimate = ticket.get("estimate")
+        completed_at = ticket.get("completedAt")
+        assignee = ticket.get("assignee") or {}
+        creator = ticket.get("creator") or {}
+        project = ticket.get("project") or {}
 
         # Extract labels
-        labels = []
-        if ticket.get("labels") and ticket["labels"].get("nodes"):
-            labels = [
-                label["name"]
-                for label in ticket["labels"]["nodes"]
-                if label.get("name")
-            ]
+        labels = [
+            label["name"]
+            for label in (ticket.get("labels") or {}).get("nodes") or ()
+            if label.get("name")
+        ]
 
         # Format people info
-        assignee_info = "Unassigned"
-        if ticket.get("assignee"):
-            name = ticket["assignee"].get("name", "Unknown")
-            email = ticket["assignee"].get("email", "")
-            assignee_info = f"{name} ({email})" if email else name
-
-        creator_info = "Unknown"
-        if ticket.get("creator"):
-            name = ticket["creator"].get("name", "Unknown")
-            email = ticket["creator"].get("email", "")
-            creator_info = f"{name} ({email})" if email else name
+        assignee_info = _person_info(assignee, "Unassigned")
+        creator_info = _person_info(creator, "Unknown")
 
         # Build metadata
         metadata = {
             "data_type": "linear_ticket",
             "ticket_id": ticket["id"],
-            "identifier": ticket["identifier"],
-            "title": ticket["title"],
-            "state": ticket["state"]["name"],
-            "url": ticket["url"],
-            "created_at": ticket["createdAt"],
-            "updated_at": ticket["updatedAt"],
+            "identifier": identifier,
+            "title": title,
+            "state": state_name,
+            "url": url,
+            "created_at": created_at,
+            "updated_at": updated_at,
             "source": "linear",
         }
 
         # Add optional fields
-        for field in ["priority", "estimate", "completedAt"]:
-            if ticket.get(field) is not None:
-                key = "completed_at" if field == "completedAt" else field
-                metadata[key] = ticket[field]
+        if priority is not None:
+            metadata["priority"] = priority
+        if estimate is not None:
+            metadata["estimate"] = estimate
+        if completed_at is not None:
+            metadata["completed_at"] = completed_at
 
         # Add nested fields
-        if ticket.get("project") and ticket["project"].get("name"):
-            metadata["project"] = ticket["project"]["name"]
-        if ticket.get("assignee") and ticket["assignee"].get("name"):
-            metadata["assignee"] = ticket["assignee"]["name"]
-        if ticket.get("creator") and ticket["creator"].get("name"):
-            metadata["creator"] = ticket["creator"]["name"]
+        if project_name := project.get("name"):
+            metadata["project"] = project_name
+        if assignee_name := assignee.get("name"):
+            metadata["assignee"] = assignee_name
+        if creator_name := creator.get("name"):
+            metadata["creator"] = creator_name
         if labels:
             metadata["labels"] = labels
 
         # Build content
-        project_name = (
-            "None"
-            if not ticket.get("project")
-            else ticket.get("project", {}).get("name", "None")
-        )
-        content_parts = [
-            f"Ticket: {ticket['identifier']} - {ticket['title']}",
-            f"Status: {ticket['state']['name']}",
-            f"Priority: {ticket.get('priority', 'None')}",
-            f"Estimate: {ticket.get('estimate', 'None')}",
-            f"Project: {project_name}",
-            f"Assignee: {assignee_info}",
-            f"Creator: {creator_info}",
-            f"Labels: {', '.join(labels) if labels else 'None'}",
-            f"Created: {ticket['createdAt']}",
-            f"Updated: {ticket['updatedAt']}",
-        ]
-
-        if ticket.get("completedAt"):
-            content_parts.append(f"Completed: {ticket['completedAt']}")
-
-        if ticket.get("description"):
-            content_parts.append(f"\nDescription:\n{ticket['description']}")
-
-        content_parts.append(f"\nURL: {ticket['url']}")
+        description = ticket.get("description")
+        template = _CONTENT_TEMPLATES[bool(completed_at), bool(description)]
+        content = template.format_map({
+            "identifier": identifier,
+            "title": title,
+            "state": state_name,
+            # format_map renders a missing (None) value as "None", as before
+            "priority": priority,
+            "estimate": estimate,
+            "project": project.get("name", "None") if project else "None",
+            "assignee": assignee_info,
+            "creator": creator_info,
+            "labels": ", ".join(labels) if labels else "None",
+            "created": created_at,
+            "updated": updated_at,
+            "completed": completed_at,
+            "description": description,
+            "url": url,
+        })
 
-        return "\n".join(content_parts), metadata
+        return content, metadata
 
 
 # Create a default instance
@@ -1,82 +1,263 @@
-import pymongo
+import asyncio
+import hmac
+import logging
+import secrets
+import time
+from collections import OrderedDict
+
+from pymongo import ASCENDING, AsyncMongoClient, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 from passlib.context import CryptContext
 
 from app.models import (
     AccountDetails,
     LoginDetails,
 )
-from app.constants import MONGO_USERNAME, MONGO_PASSWORD
+from app.constants import (
+    BCRYPT_ROUNDS,
+    MONGO_USERNAME,
+    MONGO_PASSWORD,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__ident="2b",
+    deprecated="auto",
+)
+
+
+def benchmark_password_hashing() -> float:
+    """Time one hash at the configured cost and log it, so BCRYPT_ROUNDS can be tuned per host."""
+    started = time.perf_counter()
+    pwd_context.hash("benchmark-password")
+    elapsed = time.perf_counter() - started
+    backend = pwd_context.handler("bcrypt").get_backend()
+    logger.info(
+        "bcrypt (%s backend) at %d rounds: %.0f ms per hash", backend, BCRYPT_ROUNDS, elapsed * 1000
+    )
+    return elapsed
+
+# Recently verified logins, so a client re-authenticating with the same password skips
+# bcrypt. Entries are HMACs under a per-process secret (no password, nor anything that
+# could be brute-forced offline, is kept) and cover the stored hash, so changing the
+# password invalidates them. Only successes are cached: wrong guesses always pay bcrypt.
+_VERIFY_CACHE_SIZE = 4096
+_VERIFY_CACHE_TTL_S = 900.0
+_verify_secret = secrets.token_bytes(32)
+_verified_logins: "OrderedDict[bytes, float]" = OrderedDict()
+
 
+def _login_key(email: str, password: str, stored_hash: str) -> bytes:
+    message = "\0".join((email, password, stored_hash)).encode()
+    # One-shot hmac.digest runs entirely in OpenSSL (hardware SHA where available)
+    return hmac.digest(_verify_secret, message, "sha256")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def _recently_verified(key: bytes) -> bool:
+    verified_at = _verified_logins.get(key)
+    if verified_at is None:
+        return False
+    if time.monotonic() - verified_at >= _VERIFY_CACHE_TTL_S:
+        _verified_logins.pop(key, None)
+        return False
+    _verified_logins.move_to_end(key)
+    return True
+
+
+def _remember_verified(key: bytes) -> None:
+    _verified_logins[key] = time.monotonic()
+    _verified_logins.move_to_end(key)
+    while len(_verified_logins) > _VERIFY_CACHE_SIZE:
+        _verified_logins.popitem(last=False)
 
 
 class MongoClient:
     def __init__(self):
-        self.client = pymongo.MongoClient(
+        # Native asyncio driver: queries await the socket instead of blocking the
+        # event loop. Created once below and shared, so every request uses one pool.
+        self.client = AsyncMongoClient(
             f"mongodb+srv://{MONGO_USERNAME}:{MONGO_PASSWORD}"
             "@cluster0.ns4xyla.mongodb.net/"
-            "?retryWrites=true&w=majority&appName=Cluster0"
+            "?retryWrites=true&w=majority&appName=Cluster0",
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=300_000,
+            # Fail fast instead of hanging a request when the pool or cluster is unavailable
+            waitQueueTimeoutMS=5_000,
+            serverSelectionTimeoutMS=3_000,
+            # zstd needs the zstandard package; pymongo skips it with a warning and uses zlib
+            compressors="zstd,zlib",
         )
         self.db = self.client.users
         self.users = self.db.users
 
-    def user_exists(self, email: str) -> bool:
+    async def ensure_indexes(self):
+        """
+        Create the indexes behind every lookup in this class. Idempotent; called at startup.
+        The unique email/username and per-user lesson indexes are what make signups and
+        lesson writes reject duplicates, so failing to build them raises and stops startup.
+        The rest only speed up queries and are best-effort.
+        """
+        required = {
+            self.users: [
+                IndexModel("email", unique=True),
+                IndexModel("username", unique=True),
+            ],
+            self.db.lessons: [
+                IndexModel([("user_email", ASCENDING), ("id", ASCENDING)], unique=True),
+            ],
+        }
+        best_effort = {
+            self.users: [
+                IndexModel("repositories.id"),
+            ],
+            self.db.lessons: [
+                IndexModel("id"),
+            ],
+            self.db.lesson_progress: [
+                IndexModel([("user_email", ASCENDING), ("lesson_id", ASCENDING)], unique=True),
+                IndexModel("lesson_id"),
+            ],
+            self.db.connection_states: [
+                IndexModel([("user_email", ASCENDING), ("source_type", ASCENDING)], unique=True),
+            ],
+            self.db.interactive_lessons: [
+                IndexModel([("user_email", ASCENDING), ("id", ASCENDING)]),
+                IndexModel([("user_email", ASCENDING), ("created_at", ASCENDING)]),
+            ],
+        }
+        for collection, models in required.items():
+            try:
+                await collection.create_indexes(models)
+            except Exception:
+                # e.g. existing duplicate emails; they must be cleaned up before serving
+                logger.exception("Error creating required indexes on %s", collection.name)
+                raise
+        for collection, models in best_effort.items():
+            try:
+                await collection.create_indexes(models)
+            except Exception:
+                logger.exception("Error creating indexes on %s", collection.name)
+
+    async def migrate_embedded_lessons(self):
+        """
+        Move lessons still embedded in user documents into the lessons collection.
+        Idempotent; called at startup. A user's array is only removed once every one
+        of its lessons has been written, so an interrupted run just resumes. Raises if
+        it cannot finish, so the app never starts against half-migrated data.
+        """
+        import uuid
+
+        try:
+            async for user in self.users.find({"lessons": {"$exists": True}}, {"email": 1, "lessons": 1}):
+                email = user["email"]
+                lessons = user["lessons"]
+
+                # Lessons are keyed by (user_email, id), so a missing or repeated id would
+                # merge several lessons into one document. Give those a fresh id, stored
+                # back in the array first so a rerun upserts the same documents.
+                seen_ids = set()
+                assigned_ids = False
+                for lesson in lessons:
+                    if not lesson.get("id") or lesson["id"] in seen_ids:
+                        lesson["id"] = str(uuid.uuid4())
+                        assigned_ids = True
+                    seen_ids.add(lesson["id"])
+                if assigned_ids:
+                    await self.users.update_one({"_id": user["_id"]}, {"$set": {"lessons": lessons}})
+
+                operations = [
+                    UpdateOne(
+                        {"user_email": email, "id": lesson["id"]},
+                        {"$setOnInsert": {**lesson, "user_email": email}},
+                        upsert=True,
+                    )
+                    for lesson in lessons
+                ]
+                if operations:
+                    result = await self.db.lessons.bulk_write(operations)
+                    migrated = result.matched_count + result.upserted_count
+                    if migrated != len(operations):
+                        raise RuntimeError(
+                            f"Only {migrated} of {len(operations)} lessons for {email} were written"
+                        )
+                await self.users.update_one({"_id": user["_id"]}, {"$unset": {"lessons": ""}})
+        except Exception:
+            logger.exception("Error migrating embedded lessons")
+            raise
+
+    async def user_exists(self, email: str) -> bool:
         """
         Check if a user with the given email exists.
         Returns True if found, False otherwise.
         """
         try:
-            return bool(self.users.find_one({"email": email}))
+            return bool(await self.users.find_one({"email": email}, {"_id": 1}))
         except Exception as e:
             print(f"Error checking if user exists for {email}: {e}")
             return False
 
-    def username_exists(self, username: str) -> bool:
+    async def username_exists(self, username: str) -> bool:
         """
         Check if a user with the given username exists.
         Returns True if found, False otherwise.
         """
         try:
-            return bool(self.users.find_one({"username": username}))
+            return bool(await self.users.find_one({"username": username}, {"_id": 1}))
         except Exception as e:
             print(f"Error checking if username exists for {username}: {e}")
             return False
 
-    def create_account(self, account_details: AccountDetails) -> bool:
-        if self.user_exists(account_details.email):
-            return False
-        
-        if self.username_exists(account_details.username):
-            return False
-
+    async def create_account(self, account_details: AccountDetails) -> bool:
+        """
+        Insert a new user. Returns False if the email or username is already taken.
+        The unique indexes make this a single atomic round trip, so concurrent
+        signups with the same email cannot both succeed.
+        """
         user_doc = {
             "email": account_details.email,
-            "password": pwd_context.hash(account_details.password),
+            # bcrypt runs on a worker thread so it doesn't stall the event loop
+            "password": await asyncio.to_thread(pwd_context.hash, account_details.password),
             "username": account_details.username,
         }
-        self.users.insert_one(user_doc)
+        try:
+            await self.users.insert_one(user_doc)
+        except DuplicateKeyError:
+            return False
         return True
 
-    def verify_account(self, login_details: LoginDetails) -> bool:
+    async def verify_account(self, login_details: LoginDetails) -> bool:
         try:
-            user = self.users.find_one({"email": login_details.email})
-            if user and pwd_context.verify(
-                login_details.password, user.get("password")
-            ):
+            user = await self.users.find_one(
+                {"email": login_details.email}, {"_id": 1, "password": 1}
+            )
+            if not user or not user.get("password"):
+                return False
+
+            key = _login_key(login_details.email, login_details.password, user["password"])
+            if _recently_verified(key):
+                return True
+            if await asyncio.to_thread(pwd_context.verify, login_details.password, user["password"]):
+                _remember_verified(key)
                 return True
             return False
         except Exception as e:
             print(f"Error verifying account for {login_details.email}: {e}")
             return False
 
-    def update_user_integrations(
+    async def update_user_integrations(
         self, email: str, integration: str, is_enabled: bool
     ) -> bool:
         try:
             # Use dot notation to update specific field within integrations object
             update_field = f"integrations.{integration}"
-            self.users.update_one(
+            await self.users.update_one(
                 {"email": email}, {"$set": {update_field: is_enabled}}
             )
             return True
@@ -84,9 +265,9 @@ class MongoClient:
             print(f"Error updating user integrations for {email}: {e}")
             return False
 
-    def get_user_integrations(self, email: str) -> dict:
+    async def get_user_integrations(self, email: str) -> dict:
         try:
-            user = self.users.find_one({"email": email})
+            user = await self.users.find_one({"email": email}, {"_id": 0, "integrations": 1})
             if user and "integrations" in user:
                 return user["integrations"]
             else:
@@ -96,9 +277,9 @@ class MongoClient:
             print(f"Error getting user integrations for {email}: {e}")
             return {"github": False, "linear": False, "slack": False}
 
-    def save_lesson(self, email: str, lesson_data: dict) -> str:
+    async def save_lesson(self, email: str, lesson_data: dict) -> str:
         """
-        Save a lesson for a user. Creates lessons array if it doesn't exist.
+        Save a lesson for a user.
         Returns the lesson ID.
         """
         try:
@@ -110,17 +291,17 @@ class MongoClient:
                 "id": lesson_id,
                 "created_at": datetime.utcnow(),
                 **lesson_data,
+                "user_email": email,
             }
 
-            # Use $push to add lesson to lessons array, creating it if it doesn't exist
-            self.users.update_one({"email": email}, {"$push": {"lessons": lesson_doc}})
+            await self.db.lessons.insert_one(lesson_doc)
 
             return lesson_id
         except Exception as e:
             print(f"Error saving lesson for {email}: {e}")
             raise e
 
-    def save_new_lesson(self, lesson_dict: dict) -> str:
+    async def save_new_lesson(self, lesson_dict: dict) -> str:
         """
         Save a new lesson structure for a user. 
         Returns the lesson ID.
@@ -130,82 +311,75 @@ class MongoClient:
             if not email:
                 raise ValueError("user_email is required in lesson data")
 
-            # Use $push to add lesson to lessons array, creating it if it doesn't exist
-            self.users.update_one({"email": email}, {"$push": {"lessons": lesson_dict}})
+            # Copy so insert_one's generated _id doesn't leak into the caller's dict
+            await self.db.lessons.insert_one(dict(lesson_dict))
 
             return lesson_dict.get("id")
         except Exception as e:
             print(f"Error saving new lesson: {e}")
             raise e
 
-    def get_user_lesson_summaries(self, email: str) -> list:
+    async def get_user_lesson_summaries(self, email: str) -> list:
         """
         Get lesson summaries for a user (id, title, description, duration, created_at).
         Returns empty list if no lessons exist.
         """
         try:
-            user = self.users.find_one({"email": email})
-            if user and "lessons" in user:
-                # Return only summary fields for each lesson
-                summaries = []
-                for lesson in user["lessons"]:
-                    summary = {
-                        "id": lesson.get("id"),
-                        "title": lesson.get("title"),
-                        "description": lesson.get("description"),
-                        "estimated_duration_minutes": lesson.get("estimated_duration_minutes", 15),
-                        "created_at": lesson.get("created_at")
-                    }
-                    summaries.append(summary)
-                return summaries
-            else:
-                return []
+            lessons = self.db.lessons.find(
+                {"user_email": email},
+                {"_id": 0, "id": 1, "title": 1, "description": 1, "estimated_duration_minutes": 1, "created_at": 1},
+            ).sort("_id", ASCENDING)
+            # Return only summary fields for each lesson
+            return [
+                {
+                    "id": lesson.get("id"),
+                    "title": lesson.get("title"),
+                    "description": lesson.get("description"),
+                    "estimated_duration_minutes": lesson.get("estimated_duration_minutes", 15),
+                    "created_at": lesson.get("created_at")
+                }
+                async for lesson in lessons
+            ]
         except Exception as e:
             print(f"Error getting user lesson summaries for {email}: {e}")
             return []
 
-    def get_user_lessons(self, email: str) -> list:
+    async def get_user_lessons(self, email: str) -> list:
         """
         Get all lessons for a user.
         Returns empty list if no lessons exist.
         """
         try:
-            user = self.users.find_one({"email": email})
-            if user and "lessons" in user:
-                return user["lessons"]
-            else:
-                return []
+            return await self.db.lessons.find(
+                {"user_email": email}, {"_id": 0, "user_email": 0}
+            ).sort("_id", ASCENDING).to_list()
         except Exception as e:
             print(f"Error getting user lessons for {email}: {e}")
             return []
 
-    def get_lesson_by_id(self, email: str, lesson_id: str) -> dict:
+    async def get_lesson_by_id(self, email: str, lesson_id: str) -> dict:
         """
         Get a specific lesson by ID for a user.
         Returns None if lesson not found.
         """
         try:
-            user = self.users.find_one(
-                {"email": email, "lessons.id": lesson_id}, {"lessons.$": 1}
+            return await self.db.lessons.find_one(
+                {"user_email": email, "id": lesson_id}, {"_id": 0, "user_email": 0}
             )
-            if user and "lessons" in user and len(user["lessons"]) > 0:
-                return user["lessons"][0]
-            else:
-                return None
         except Exception as e:
             print(f"Error getting lesson {lesson_id} for {email}: {e}")
             return None
 
-    def get_username_by_email(self, email: str) -> str:
+    async def get_username_by_email(self, email: str) -> str:
         try:
-            return self.users.find_one({"email": email})["username"]
+            return (await self.users.find_one({"email": email}, {"_id": 0, "username": 1}))["username"]
         except Exception as e:
             print(f"Error getting username by email {email}: {e}")
             return None
 
-    def set_linear_api_key(self, email: str, api_key: str) -> bool:
+    async def set_linear_api_key(self, email: str, api_key: str) -> bool:
         try:
-            self.users.update_one(
+            await self.users.update_one(
                 {"email": email}, {"$set": {"linear_api_key": api_key}}
             )
             return True
@@ -213,16 +387,16 @@ class MongoClient:
             print(f"Error setting linear api key for {email}: {e}")
             return False
 
-    def get_linear_api_key(self, email: str) -> str:
+    async def get_linear_api_key(self, email: str) -> str:
         try:
-            return self.users.find_one({"email": email})["linear_api_key"]
+            return (await self.users.find_one({"email": email}, {"_id": 0, "linear_api_key": 1}))["linear_api_key"]
         except Exception as e:
             print(f"Error getting linear api key for {email}: {e}")
             return None
 
-    def set_slack_api_key(self, email: str, api_key: str) -> bool:
+    async def set_slack_api_key(self, email: str, api_key: str) -> bool:
         try:
-            self.users.update_one(
+            await self.users.update_one(
                 {"email": email}, {"$set": {"slack_api_key": api_key}}
             )
             return True
@@ -230,14 +404,14 @@ class MongoClient:
             print(f"Error setting slack api key for {email}: {e}")
             return False
     
-    def get_slack_api_key(self, email: str) -> str:
+    async def get_slack_api_key(self, email: str) -> str:
         try:
-            return self.users.find_one({"email": email})["slack_api_key"]
+            return (await self.users.find_one({"email": email}, {"_id": 0, "slack_api_key": 1}))["slack_api_key"]
         except Exception as e:
             print(f"Error getting slack api key for {email}: {e}")
             return None
 
-    def add_repository(self, email: str, repository_data: dict) -> str:
+    async def add_repository(self, email: str, repository_data: dict) -> str:
         """
         Add a repository to user's repositories list.
         Returns the repository ID.
@@ -257,19 +431,19 @@ class MongoClient:
             }
 
             # Use $push to add repository to repositories array
-            self.users.update_one({"email": email}, {"$push": {"repositories": repository_doc}})
+            await self.users.update_one({"email": email}, {"$push": {"repositories": repository_doc}})
             return repository_id
         except Exception as e:
             print(f"Error adding repository for {email}: {e}")
             raise e
 
-    def remove_repository(self, email: str, repository_id: str) -> bool:
+    async def remove_repository(self, email: str, repository_id: str) -> bool:
         """
         Remove a repository from user's repositories list.
         Returns True if successful, False otherwise.
         """
         try:
-            result = self.users.update_one(
+            result = await self.users.update_one(
                 {"email": email}, 
                 {"$pull": {"repositories": {"id": repository_id}}}
             )
@@ -278,13 +452,13 @@ class MongoClient:
             print(f"Error removing repository {repository_id} for {email}: {e}")
             return False
 
-    def get_user_repositories(self, email: str) -> list:
+    async def get_user_repositories(self, email: str) -> list:
         """
         Get all repositories for a user.
         Returns empty list if no repositories exist.
         """
         try:
-            user = self.users.find_one({"email": email})
+            user = await self.users.find_one({"email": email}, {"_id": 0, "repositories": 1})
             if user and "repositories" in user:
                 return user["repositories"]
             else:
@@ -293,13 +467,13 @@ class MongoClient:
             print(f"Error getting user repositories for {email}: {e}")
             return []
 
-    def update_repository_processed_status(self, email: str, repository_id: str, is_processed: bool) -> bool:
+    async def update_repository_processed_status(self, email: str, repository_id: str, is_processed: bool) -> bool:
         """
         Update the processed status of a repository.
         Returns True if successful, False otherwise.
         """
         try:
-            result = self.users.update_one(
+            result = await self.users.update_one(
                 {"email": email, "repositories.id": repository_id},
                 {"$set": {"repositories.$.is_processed": is_processed}}
             )
@@ -308,12 +482,15 @@ class MongoClient:
             print(f"Error updating repository processed status for {email}: {e}")
             return False
 
-    def get_user_profile(self, email: str) -> dict:
+    async def get_user_profile(self, email: str) -> dict:
         """
         Get complete user profile including repositories and integrations.
         """
         try:
-            user = self.users.find_one({"email": email})
+            user = await self.users.find_one(
+                {"email": email},
+                {"_id": 0, "email": 1, "username": 1, "created_at": 1, "repositories": 1, "integrations": 1},
+            )
             if not user:
                 return None
             
@@ -325,7 +502,12 @@ class MongoClient:
             }
             
             repositories = user.get("repositories", [])
-            integrations = self.get_user_integrations(email)
+            # Same defaults as get_user_integrations, without a second round trip
+            integrations = (
+                user["integrations"]
+                if "integrations" in user
+                else {"github": False, "linear": False, "slack": False}
+            )
             
             return {
                 "user": user_data,
@@ -336,7 +518,7 @@ class MongoClient:
             print(f"Error getting user profile for {email}: {e}")
             return None
 
-    def save_interactive_lesson_session(self, session_data: dict) -> str:
+    async def save_interactive_lesson_session(self, session_data: dict) -> str:
         """
         Save an interactive lesson session.
         Returns the session ID.
@@ -344,20 +526,20 @@ class MongoClient:
         try:
             # Save to a separate collection for interactive lesson sessions
             interactive_lessons_collection = self.db.interactive_lessons
-            result = interactive_lessons_collection.insert_one(session_data)
+            result = await interactive_lessons_collection.insert_one(session_data)
             return str(result.inserted_id)
         except Exception as e:
             print(f"Error saving interactive lesson session: {e}")
             raise e
 
-    def get_interactive_lesson_session(self, session_id: str, user_email: str) -> dict:
+    async def get_interactive_lesson_session(self, session_id: str, user_email: str) -> dict:
         """
         Get an interactive lesson session by ID and user email.
         Returns None if not found.
         """
         try:
             interactive_lessons_collection = self.db.interactive_lessons
-            session = interactive_lessons_collection.find_one({
+            session = await interactive_lessons_collection.find_one({
                 "id": session_id,
                 "user_email": user_email
             })
@@ -366,13 +548,13 @@ class MongoClient:
             print(f"Error getting interactive lesson session {session_id}: {e}")
             return None
 
-    def update_interactive_lesson_session(self, session_data: dict):
+    async def update_interactive_lesson_session(self, session_data: dict):
         """
         Update an interactive lesson session.
         """
         try:
             interactive_lessons_collection = self.db.interactive_lessons
-            interactive_lessons_collection.update_one(
+            await interactive_lessons_collection.update_one(
                 {"id": session_data["id"], "user_email": session_data["user_email"]},
                 {"$set": session_data}
             )
@@ -380,55 +562,52 @@ class MongoClient:
             print(f"Error updating interactive lesson session: {e}")
             raise e
 
-    def get_user_interactive_lesson_sessions(self, email: str) -> list:
+    async def get_user_interactive_lesson_sessions(self, email: str) -> list:
         """
         Get all interactive lesson sessions for a user.
         Returns empty list if no sessions exist.
         """
         try:
             interactive_lessons_collection = self.db.interactive_lessons
-            sessions = list(interactive_lessons_collection.find(
+            sessions = await interactive_lessons_collection.find(
                 {"user_email": email}
-            ).sort("created_at", -1))
+            ).sort("created_at", -1).to_list()
             return sessions
         except Exception as e:
             print(f"Error getting user interactive lesson sessions for {email}: {e}")
             return []
 
-    def update_lesson_slide(self, email: str, lesson_id: str, slide_index: int, slide_data: dict):
+    async def update_lesson_slide(self, email: str, lesson_id: str, slide_index: int, slide_data: dict):
         """
         Update a specific slide within a lesson.
         """
         try:
-            self.users.update_one(
-                {"email": email, "lessons.id": lesson_id},
-                {"$set": {f"lessons.$.slides.{slide_index}": slide_data}}
+            await self.db.lessons.update_one(
+                {"user_email": email, "id": lesson_id},
+                {"$set": {f"slides.{slide_index}": slide_data}}
             )
         except Exception as e:
             print(f"Error updating lesson slide for {email}: {e}")
             raise e
 
-    def delete_lesson(self, lesson_id: str) -> bool:
+    async def delete_lesson(self, lesson_id: str) -> bool:
         """
         Delete a lesson by ID from all users.
         Returns True if lesson was found and deleted.
         """
         try:
             # Remove the lesson from all users who have it
-            result = self.users.update_many(
-                {"lessons.id": lesson_id},
-                {"$pull": {"lessons": {"id": lesson_id}}}
-            )
+            result = await self.db.lessons.delete_many({"id": lesson_id})
             
             # Also remove progress for this lesson
-            self.db.lesson_progress.delete_many({"lesson_id": lesson_id})
+            await self.db.lesson_progress.delete_many({"lesson_id": lesson_id})
             
-            return result.modified_count > 0
+            return result.deleted_count > 0
         except Exception as e:
             print(f"Error deleting lesson {lesson_id}: {e}")
             return False
 
-    def save_lesson_progress(self, progress_data: dict) -> bool:
+    async def save_lesson_progress(self, progress_data: dict) -> bool:
         """
         Save or update lesson progress for a user.
         """
@@ -438,7 +617,7 @@ class MongoClient:
             # Update or insert progress
             progress_data["last_accessed_at"] = datetime.utcnow()
             
-            self.db.lesson_progress.update_one(
+            await self.db.lesson_progress.update_one(
                 {"lesson_id": progress_data["lesson_id"], "user_email": progress_data["user_email"]},
                 {"$set": progress_data},
                 upsert=True
@@ -448,13 +627,13 @@ class MongoClient:
             print(f"Error saving lesson progress: {e}")
             return False
 
-    def get_lesson_progress(self, user_email: str, lesson_id: str) -> dict:
+    async def get_lesson_progress(self, user_email: str, lesson_id: str) -> dict:
         """
         Get lesson progress for a specific user and lesson.
         Returns None if no progress exists.
         """
         try:
-            progress = self.db.lesson_progress.find_one({
+            progress = await self.db.lesson_progress.find_one({
                 "user_email": user_email,
                 "lesson_id": lesson_id
             })
@@ -463,60 +642,68 @@ class MongoClient:
             print(f"Error getting lesson progress: {e}")
             return None
 
-    def get_user_lesson_summaries_with_progress(self, email: str) -> list:
+    async def get_user_lesson_summaries_with_progress(self, email: str) -> list:
         """
         Get lesson summaries for a user with progress information.
         Returns empty list if no lessons exist.
+        The join with lesson_progress runs server-side, so slides never leave the database.
         """
         try:
-            user = self.users.find_one({"email": email})
-            if user and "lessons" in user:
-                # Get all progress for this user
-                progress_cursor = self.db.lesson_progress.find({"user_email": email})
-                progress_dict = {p["lesson_id"]: p for p in progress_cursor}
-                
-                # Return summary fields with progress info for each lesson
-                summaries = []
-                for lesson in user["lessons"]:
-                    lesson_id = lesson.get("id")
-                    progress = progress_dict.get(lesson_id, {})
-                    
-                    summary = {
-                        "id": lesson_id,
-                        "title": lesson.get("title"),
-                        "description": lesson.get("description"),
-                        "estimated_duration_minutes": lesson.get("estimated_duration_minutes", 15),
-                        "created_at": lesson.get("created_at"),
-                        "is_completed": progress.get("is_completed", False),
-                        "completion_percentage": progress.get("completion_percentage", 0.0),
-                        "completed_at": progress.get("completed_at")
+            pipeline = [
+                {"$match": {"user_email": email}},
+                {"$sort": {"_id": 1}},
+                {
+                    "$lookup": {
+                        "from": "lesson_progress",
+                        "let": {"lesson_id": "$id"},
+                        "pipeline": [
+                            {"$match": {"user_email": email, "$expr": {"$eq": ["$lesson_id", "$$lesson_id"]}}},
+                            {"$project": {"_id": 0, "is_completed": 1, "completion_percentage": 1, "completed_at": 1}},
+                            {"$limit": 1},
+                        ],
+                        "as": "progress",
                     }
-                    summaries.append(summary)
-                return summaries
-            else:
-                return []
+                },
+                {"$set": {"progress": {"$ifNull": [{"$first": "$progress"}, {}]}}},
+                {
+                    "$project": {
+                        "_id": 0,
+                        # $ifNull keeps absent fields as explicit nulls, like dict.get did
+                        "id": {"$ifNull": ["$id", None]},
+                        "title": {"$ifNull": ["$title", None]},
+                        "description": {"$ifNull": ["$description", None]},
+                        "estimated_duration_minutes": {"$ifNull": ["$estimated_duration_minutes", 15]},
+                        "created_at": {"$ifNull": ["$created_at", None]},
+                        "is_completed": {"$ifNull": ["$progress.is_completed", False]},
+                        "completion_percentage": {"$ifNull": ["$progress.completion_percentage", 0.0]},
+                        "completed_at": {"$ifNull": ["$progress.completed_at", None]},
+                    }
+                },
+            ]
+            cursor = await self.db.lessons.aggregate(pipeline)
+            return await cursor.to_list()
         except Exception as e:
             print(f"Error getting user lesson summaries with progress for {email}: {e}")
             return []
 
     # Enhanced Connection State Management Methods
     
-    def get_connection_states(self, email: str) -> list:
+    async def get_connection_states(self, email: str) -> list:
         """
         Get all connection states for a user.
         Returns empty list if no states exist.
         """
         try:
             connection_states_collection = self.db.connection_states
-            states = list(connection_states_collection.find(
+            states = await connection_states_collection.find(
                 {"user_email": email}
-            ).sort("updated_at", -1))
+            ).sort("updated_at", -1).to_list()
             return states
         except Exception as e:
             print(f"Error getting connection states for {email}: {e}")
             return []
 
-    def create_or_update_connection_state(self, connection_data: dict) -> str:
+    async def create_or_update_connection_state(self, connection_data: dict) -> str:
         """
         Create or update a connection state.
         Returns the connection ID.
@@ -526,35 +713,31 @@ class MongoClient:
             import uuid
             
             connection_states_collection = self.db.connection_states
+            now = datetime.utcnow()
             
-            # Check if connection already exists
-            existing = connection_states_collection.find_one({
-                "user_email": connection_data["user_email"],
-                "source_type": connection_data["source_type"]
-            })
-            
-            if existing:
-                # Update existing connection
-                connection_data["updated_at"] = datetime.utcnow()
-                connection_states_collection.update_one(
-                    {"id": existing["id"]},
-                    {"$set": connection_data}
-                )
-                return existing["id"]
-            else:
-                # Create new connection
-                connection_id = str(uuid.uuid4())
-                connection_data["id"] = connection_id
-                connection_data["created_at"] = datetime.utcnow()
-                connection_data["updated_at"] = datetime.utcnow()
-                connection_states_collection.insert_one(connection_data)
-                return connection_id
+            # One atomic upsert on the unique (user_email, source_type) key: a new state
+            # gets its id and created_at, an existing one keeps them
+            fields = {k: v for k, v in connection_data.items() if k not in ("id", "created_at")}
+            state = await connection_states_collection.find_one_and_update(
+                {
+                    "user_email": connection_data["user_email"],
+                    "source_type": connection_data["source_type"]
+                },
+                {
+                    "$set": {**fields, "updated_at": now},
+                    "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": now},
+                },
+                projection={"_id": 0, "id": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            return state["id"]
                 
         except Exception as e:
             print(f"Error creating/updating connection state: {e}")
             raise e
 
-    def add_connection_event(self, email: str, source_type: str, event_data: dict):
+    async def add_connection_event(self, email: str, source_type: str, event_data: dict):
         """
         Add an event to a connection's history.
         Keeps only the last 10 events per connection.
@@ -570,7 +753,7 @@ class MongoClient:
             event_data["timestamp"] = datetime.utcnow()
             
             # Add event to connection and keep only last 10
-            connection_states_collection.update_one(
+            await connection_states_collection.update_one(
                 {
                     "user_email": email,
                     "source_type": source_type
@@ -590,7 +773,7 @@ class MongoClient:
             print(f"Error adding connection event for {email}: {e}")
             raise e
 
-    def update_connection_health(self, email: str, source_type: str, health_data: dict):
+    async def update_connection_health(self, email: str, source_type: str, health_data: dict):
         """
         Update connection health status and error tracking.
         """
@@ -609,7 +792,7 @@ class MongoClient:
             if "error" in health_data:
                 if health_data["error"]:
                     # Increment error count and set last error
-                    connection_states_collection.update_one(
+                    await connection_states_collection.update_one(
                         {"user_email": email, "source_type": source_type},
                         {
                             "$set": {
@@ -623,12 +806,12 @@ class MongoClient:
                 else:
                     # Reset error count on success
                     update_data["error_count"] = 0
-                    connection_states_collection.update_one(
+                    await connection_states_collection.update_one(
                         {"user_email": email, "source_type": source_type},
                         {"$set": update_data}
                     )
             else:
-                connection_states_collection.update_one(
+                await connection_states_collection.update_one(
                     {"user_email": email, "source_type": source_type},
                     {"$set": update_data}
                 )
@@ -637,7 +820,7 @@ class MongoClient:
             print(f"Error updating connection health for {email}: {e}")
             raise e
 
-    def update_connection_sync_info(self, email: str, source_type: str, sync_data: dict):
+    async def update_connection_sync_info(self, email: str, source_type: str, sync_data: dict):
         """
         Update connection sync information.
         """
@@ -656,7 +839,7 @@ class MongoClient:
             # Remove None values
             update_data = {k: v for k, v in update_data.items() if v is not None}
             
-            connection_states_collection.update_one(
+            await connection_states_collection.update_one(
                 {"user_email": email, "source_type": source_type},
                 {"$set": update_data}
             )
@@ -665,37 +848,43 @@ class MongoClient:
             print(f"Error updating connection sync info for {email}: {e}")
             raise e
 
-    def get_connection_state_summary(self, email: str) -> dict:
+    async def get_connection_state_summary(self, email: str) -> dict:
         """
         Get a summary of all connection states for a user.
         """
         try:
-            states = self.get_connection_states(email)
+            # Count server-side, one row per source type, instead of shipping every
+            # state (with its recent_events) back to count it here
+            cursor = await self.db.connection_states.aggregate([
+                {"$match": {"user_email": email}},
+                {
+                    "$group": {
+                        "_id": {"$ifNull": ["$source_type", "unknown"]},
+                        "total": {"$sum": 1},
+                        "connected": {"$sum": {"$cond": ["$is_connected", 1, 0]}},
+                        "healthy": {"$sum": {"$cond": [{"$eq": ["$health_status", "healthy"]}, 1, 0]}},
+                        "unhealthy": {"$sum": {"$cond": [{"$eq": ["$health_status", "unhealthy"]}, 1, 0]}},
+                        "synced": {"$sum": {"$cond": ["$last_sync_at", 1, 0]}},
+                    }
+                },
+            ])
+            rows = await cursor.to_list()
             
             summary = {
-                "total_connections": len(states),
-                "connected_count": len([s for s in states if s.get("is_connected", False)]),
-                "healthy_count": len([s for s in states if s.get("health_status") == "healthy"]),
-                "error_count": len([s for s in states if s.get("health_status") == "unhealthy"]),
-                "last_sync_count": len([s for s in states if s.get("last_sync_at")]),
-                "sources_by_type": {}
-            }
-            
-            # Count by source type
-            for state in states:
-                source_type = state.get("source_type", "unknown")
-                if source_type not in summary["sources_by_type"]:
-                    summary["sources_by_type"][source_type] = {
-                        "total": 0,
-                        "connected": 0,
-                        "healthy": 0
+                "total_connections": sum(row["total"] for row in rows),
+                "connected_count": sum(row["connected"] for row in rows),
+                "healthy_count": sum(row["healthy"] for row in rows),
+                "error_count": sum(row["unhealthy"] for row in rows),
+                "last_sync_count": sum(row["synced"] for row in rows),
+                "sources_by_type": {
+                    row["_id"]: {
+                        "total": row["total"],
+                        "connected": row["connected"],
+                        "healthy": row["healthy"]
                     }
-                
-                summary["sources_by_type"][source_type]["total"] += 1
-                if state.get("is_connected", False):
-                    summary["sources_by_type"][source_type]["connected"] += 1
-                if state.get("health_status") == "healthy":
-                    summary["sources_by_type"][source_type]["healthy"] += 1
+                    for row in rows
+                }
+            }
             
             return summary
             
@@ -703,11 +892,14 @@ class MongoClient:
             print(f"Error getting connection state summary for {email}: {e}")
             return {}
 
-    def initialize_default_connection_states(self, email: str):
+    async def initialize_default_connection_states(self, email: str):
         """
         Initialize default connection states for a new user.
         """
         try:
+            from datetime import datetime
+            import uuid
+
             default_sources = [
                 {
                     "user_email": email,
@@ -747,8 +939,26 @@ class MongoClient:
                 }
             ]
             
-            for source_data in default_sources:
-                self.create_or_update_connection_state(source_data)
+            # One round trip for all three; states that already exist are left untouched
+            now = datetime.utcnow()
+            await self.db.connection_states.bulk_write(
+                [
+                    UpdateOne(
+                        {"user_email": email, "source_type": source_data["source_type"]},
+                        {
+                            "$setOnInsert": {
+                                **source_data,
+                                "id": str(uuid.uuid4()),
+                                "created_at": now,
+                                "updated_at": now,
+                            }
+                        },
+                        upsert=True,
+                    )
+                    for source_data in default_sources
+                ],
+                ordered=False,
+            )
                 
         except Exception as e:
             print(f"Error initializing default connection states for {email}: {e}")
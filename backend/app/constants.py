@@ -1,23 +1,64 @@
 import dotenv
 import os
+import tempfile
 
 dotenv.load_dotenv()
 
+DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "yes")
+# Level for the app's own loggers (tool calls, latency events); DEBUG also enables per-result tracing
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG" if DEBUG else "WARNING").upper()
+
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 PINECONE_ENV = os.getenv("PINECONE_ENV", "us-east-1-aws")
 PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME")
+# Worker threads per Pinecone index handle, for concurrent queries over one connection pool
+PINECONE_POOL_THREADS = int(os.getenv("PINECONE_POOL_THREADS", "8"))
+# Query Pinecone over gRPC (needs the pinecone[grpc] extra); falls back to REST when unavailable
+PINECONE_USE_GRPC = os.getenv("PINECONE_USE_GRPC", "false").lower() in ("1", "true", "yes")
 DAYTONA_SNAPSHOT_NAME = os.getenv("DAYTONA_SNAPSHOT_NAME")
 DAYTONA_API_KEY = os.getenv("DAYTONA_API_KEY")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 ANTHROPIC_MODEL = os.getenv("ANTHROPIC_MODEL")
 ANTHROPIC_TEMPERATURE = os.getenv("ANTHROPIC_TEMPERATURE")
 SECRET_KEY = os.getenv("SECRET_KEY")
+# bcrypt cost for new password hashes (2^rounds iterations); tune per host from the
+# hash time logged at startup. Existing hashes keep verifying at their own cost.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 MONGO_USERNAME = os.getenv("MONGO_USERNAME")
 MONGO_PASSWORD = os.getenv("MONGO_PASSWORD")
+# Connections per Atlas host: a warm floor so bursts skip the TLS handshake, and a cap
+# past which requests queue (up to the wait-queue timeout) instead of opening more
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "200"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "10"))
 LINEAR_API_KEY = os.getenv("LINEAR_API_KEY")
 SLACK_API_KEY = os.getenv("SLACK_API_KEY")
 CLOUDINARY_CLOUD_NAME = os.getenv("CLOUDINARY_CLOUD_NAME")
 CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY")
 CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET")
 
+# Narration MP3s are cached here by content hash; oldest files are pruned past the size cap
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "tts_cache"))
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "200"))
+# Cloudinary URLs of already-uploaded videos, one small file per content-addressed render
+VIDEO_URL_CACHE_DIR = os.getenv("VIDEO_URL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "video_url_cache"))
+# Processes rendering a video's title/bullet segments in parallel; below 2 renders in-process.
+# Each process holds its own manim import (a few hundred MB), so this is opt-in.
+VIDEO_RENDER_PROCESSES = int(os.getenv("VIDEO_RENDER_PROCESSES", "0"))
+
+
+# Query/document embedding backend: "openai", "fastembed" (local ONNX, CPU) or
+# "huggingface" (local sentence-transformers, GPU when available).
+# Switching providers requires re-ingesting every namespace with the same model.
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")
+FASTEMBED_MODEL = os.getenv("FASTEMBED_MODEL", "BAAI/bge-large-en-v1.5")
+HUGGINGFACE_EMBED_MODEL = os.getenv("HUGGINGFACE_EMBED_MODEL", "BAAI/bge-large-en-v1.5")
+# "cuda", "mps" or "cpu"; empty picks the best available device
+EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE", "")
+
+# OpenAI processing tier for agent LLM calls ("priority", "default", "flex", "auto"); empty to omit
+OPENAI_SERVICE_TIER = os.getenv("OPENAI_SERVICE_TIER", "priority")
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "30"))
+
+# Open Pinecone/embedding connections in the background when an agent is created ("0" to disable)
+AGENT_WARMUP = os.getenv("AGENT_WARMUP", "1").lower() in ("1", "true", "yes")
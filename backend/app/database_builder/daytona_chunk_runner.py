@@ -27,7 +27,7 @@ class DaytonaChunkRunner:
         )
 
     async def process_repository(self, repo_url: str, email: str) -> Dict[str, Any]:
-        username = mongo_client.get_username_by_email(email)
+        username = await mongo_client.get_username_by_email(email)
         if not self._validate_github_url(repo_url):
             return {
                 "success": False,
@@ -50,7 +50,7 @@ class DaytonaChunkRunner:
             )
 
             if result.exit_code == 0:
-                mongo_client.update_user_integrations(email, "github", True)
+                await mongo_client.update_user_integrations(email, "github", True)
                 return {
                     "success": True,
                     "repository": repo_url,
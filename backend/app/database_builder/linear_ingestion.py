@@ -7,20 +7,24 @@ Uses LINEAR_API_KEY from environment variables.
 
 from llama_index.core import VectorStoreIndex, StorageContext, Settings
 from llama_index.vector_stores.pinecone import PineconeVectorStore
-from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.core.schema import TextNode
 import pinecone
-from app.api_clients.linear_client import LinearClient
+from typing import Dict
+from app.api_clients.linear_client import LinearClient, latest_updated_at
 import app.constants as constants
+from app.agent.agent_helpers import get_embedding_model
 from app.api_clients.mongo import mongo_client
 
+# index name -> team id -> newest updatedAt already written to that index; later runs
+# for the same index fetch only tickets changed since then (process-local, so a
+# restart falls back to one full fetch)
+_synced_until: Dict[str, Dict[str, str]] = {}
+
 
 class LinearTicketIngester:
-    def __init__(self, email: str):
-        self.linear_client = LinearClient(
-            api_key=mongo_client.get_linear_api_key(email=email)
-        )
-        self.username = mongo_client.get_username_by_email(email=email)
+    def __init__(self, username: str, linear_api_key: str):
+        self.linear_client = LinearClient(api_key=linear_api_key)
+        self.username = username
         self.index_name = f"{self.username}-user-database"
 
         # Initialize Pinecone
@@ -35,23 +39,34 @@ class LinearTicketIngester:
             vector_store=self.vector_store
         )
 
-        # Configure LlamaIndex to use 1024-dim OpenAI embeddings
-        Settings.embed_model = OpenAIEmbedding(
-            model="text-embedding-3-large",
-            dimensions=1024,
-            api_key=constants.OPENAI_API_KEY,
+        # Embed with the same model the agent tools query with
+        Settings.embed_model = get_embedding_model()
+
+    @classmethod
+    async def from_email(cls, email: str) -> "LinearTicketIngester":
+        """Build an ingester for the user's index and stored Linear API key."""
+        return cls(
+            username=await mongo_client.get_username_by_email(email=email),
+            linear_api_key=await mongo_client.get_linear_api_key(email=email),
         )
 
     async def ingest_tickets(self, limit: int = 100):
         """Main ingestion process using fast TextNode batch upserting."""
 
         print("🔍 Fetching tickets for all teams")
-        team_ids = await self.linear_client.get_team_ids()
-        all_tickets = []
-        for team_id in team_ids:
-            print(f"🔍 Fetching tickets for team: {team_id}")
-            tickets = await self.linear_client.fetch_team_tickets(team_id, limit)
-            all_tickets.extend(tickets)
+        # One keep-alive session for the team lookup and every team's tickets
+        async with self.linear_client:
+            team_ids = await self.linear_client.get_team_ids()
+            print(f"🔍 Fetching tickets for {len(team_ids)} teams")
+            try:
+                tickets_by_team = await self.linear_client.fetch_all_team_tickets(
+                    team_ids, limit, since=_synced_until.get(self.index_name)
+                )
+            except Exception as e:
+                # e.g. the batched query exceeded Linear's complexity limit
+                print(f"⚠️ Batched ticket query failed ({e}); fetching teams individually")
+                tickets_by_team = await self.linear_client.fetch_tickets_for_teams(team_ids, limit)
+            all_tickets = [ticket for tickets in tickets_by_team.values() for ticket in tickets]
 
         print(f"📥 Found {len(all_tickets)} tickets to process")
 
@@ -60,12 +75,11 @@ class LinearTicketIngester:
             return
 
         # Convert tickets to TextNodes for faster batch processing
-        nodes = []
-        for ticket in all_tickets:
-            content, metadata = self.linear_client.process_ticket(ticket)
-
-            node = TextNode(text=content, metadata=metadata)
-            nodes.append(node)
+        contents, metadatas = await self.linear_client.process_tickets_async(all_tickets)
+        nodes = [
+            TextNode(text=content, metadata=metadata)
+            for content, metadata in zip(contents, metadatas)
+        ]
 
         print(f"Created {len(nodes)} ticket nodes from {len(all_tickets)} tickets")
 
@@ -73,4 +87,5 @@ class LinearTicketIngester:
         print(f"🚀 Adding {len(nodes)} tickets to Pinecone index: {self.index_name}")
         VectorStoreIndex(nodes=nodes, storage_context=self.storage_context)
 
+        _synced_until.setdefault(self.index_name, {}).update(latest_updated_at(tickets_by_team))
         print("✅ All tickets successfully added to Pinecone!")
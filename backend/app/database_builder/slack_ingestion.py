@@ -9,19 +9,19 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 from llama_index.core import VectorStoreIndex, StorageContext, Settings
 from llama_index.vector_stores.pinecone import PineconeVectorStore
-from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.core.schema import TextNode
 import pinecone
 import app.constants as constants
+from app.agent.agent_helpers import get_embedding_model
 from app.api_clients.slack_client import SlackClient
 from app.api_clients.mongo import mongo_client
 
 
 class SlackMessageIngester:
-    def __init__(self, email: str):
-        self.username = mongo_client.get_username_by_email(email=email)
+    def __init__(self, username: str, slack_api_key: str):
+        self.username = username
         self.index_name = f"{self.username}-user-database"
-        self.slack_client = SlackClient(api_key=mongo_client.get_slack_api_key(email=email))
+        self.slack_client = SlackClient(api_key=slack_api_key)
 
         # Initialize Pinecone
         self.pc = pinecone.Pinecone(api_key=constants.PINECONE_API_KEY)
@@ -35,11 +35,15 @@ class SlackMessageIngester:
             vector_store=self.vector_store
         )
 
-        # Configure LlamaIndex to use 1024-dim OpenAI embeddings
-        Settings.embed_model = OpenAIEmbedding(
-            model="text-embedding-3-large",
-            dimensions=1024,
-            api_key=constants.OPENAI_API_KEY,
+        # Embed with the same model the agent tools query with
+        Settings.embed_model = get_embedding_model()
+
+    @classmethod
+    async def from_email(cls, email: str) -> "SlackMessageIngester":
+        """Build an ingester for the user's index and stored Slack API key."""
+        return cls(
+            username=await mongo_client.get_username_by_email(email=email),
+            slack_api_key=await mongo_client.get_slack_api_key(email=email),
         )
 
     async def ingest_messages(
@@ -1,4 +1,5 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 
 from app.database_builder.linear_ingestion import LinearTicketIngester
 from app.models import (
@@ -40,15 +41,45 @@ from app.models import (
 )
 from fastapi.middleware.cors import CORSMiddleware
 from app.auth import create_jwt_token
-from app.api_clients.mongo import mongo_client
+from app.api_clients.mongo import benchmark_password_hashing, mongo_client
 from app.database_builder.daytona_chunk_runner import DaytonaChunkRunner
 from app.agent.agent import Agent
+from app.agent.agent_helpers import shared_async_http_client
 from app.agent.chat_agent import ChatAgent
+from app.agent.video.video_jobs import video_job_status
+import asyncio
 import json
+import logging
+from contextlib import asynccontextmanager
 import app.constants as constants
 from datetime import datetime
 
+# Third-party libraries stay at WARNING; LOG_LEVEL only applies to the app's own loggers
+logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logging.getLogger("app").setLevel(constants.LOG_LEVEL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepare Mongo (indexes, lesson migration) before serving; close the clients on shutdown."""
+    await mongo_client.ensure_indexes()
+    await mongo_client.migrate_embedded_lessons()
+    # Tuning aid for BCRYPT_ROUNDS; hashes on a worker thread without delaying startup
+    app.state.password_benchmark = (
+        asyncio.create_task(asyncio.to_thread(benchmark_password_hashing))
+        if constants.DEBUG
+        else None
+    )
+    yield
+    if app.state.password_benchmark is not None:
+        # The worker thread can't be interrupted; one hash finishes within a second
+        await app.state.password_benchmark
+    await mongo_client.client.close()
+    await shared_async_http_client.aclose()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="CodeByte API",
     description="AI-powered learning platform API for creating personalized coding lessons",
     version="1.0.0",
@@ -76,19 +107,16 @@ async def root():
 @app.post("/create-account", response_model=AuthResponse)
 async def create_account(account_data: AccountDetails):
     try:
-        # Check for existing email
-        if mongo_client.user_exists(account_data.email):
-            raise HTTPException(status_code=400, detail="Email already exists")
-        
-        # Check for existing username
-        if mongo_client.username_exists(account_data.username):
-            raise HTTPException(status_code=400, detail="Username already exists")
-        
-        if not mongo_client.create_account(account_data):
+        if not await mongo_client.create_account(account_data):
+            # Only look up which key collided once the insert has been rejected
+            if await mongo_client.user_exists(account_data.email):
+                raise HTTPException(status_code=400, detail="Email already exists")
+            if await mongo_client.username_exists(account_data.username):
+                raise HTTPException(status_code=400, detail="Username already exists")
             raise HTTPException(status_code=400, detail="Failed to create account")
 
         # Initialize default connection states for new user
-        mongo_client.initialize_default_connection_states(account_data.email)
+        await mongo_client.initialize_default_connection_states(account_data.email)
 
         token_data = create_jwt_token(account_data.email)
         return AuthResponse(**token_data)
@@ -103,7 +131,7 @@ async def create_account(account_data: AccountDetails):
 @app.post("/login-account", response_model=AuthResponse)
 async def login_account(login_data: LoginDetails):
     try:
-        if not mongo_client.verify_account(login_data):
+        if not await mongo_client.verify_account(login_data):
             raise HTTPException(status_code=401, detail="Invalid email or password")
 
         token_data = create_jwt_token(login_data.email)
@@ -122,7 +150,7 @@ async def process_repository(request: RepositoryRequest):
             "status": "in_progress",
             "message": f"Starting repository processing for {request.github_url}"
         }
-        mongo_client.add_connection_event(request.email, "github", event_data)
+        await mongo_client.add_connection_event(request.email, "github", event_data)
         
         runner = DaytonaChunkRunner(constants.DAYTONA_SNAPSHOT_NAME)
         result = await runner.process_repository(str(request.github_url), request.email)
@@ -133,26 +161,26 @@ async def process_repository(request: RepositoryRequest):
                 "last_sync_status": "success",
                 "data_count": result.get("chunk_count", 0)
             }
-            mongo_client.update_connection_sync_info(request.email, "github", sync_data)
+            await mongo_client.update_connection_sync_info(request.email, "github", sync_data)
             
             event_data = {
                 "event_type": "sync",
                 "status": "success",
                 "message": f"Successfully processed repository {request.github_url}"
             }
-            mongo_client.add_connection_event(request.email, "github", event_data)
+            await mongo_client.add_connection_event(request.email, "github", event_data)
         else:
             sync_data = {
                 "last_sync_status": "failure"
             }
-            mongo_client.update_connection_sync_info(request.email, "github", sync_data)
+            await mongo_client.update_connection_sync_info(request.email, "github", sync_data)
             
             event_data = {
                 "event_type": "sync",
                 "status": "failure",
                 "message": f"Repository processing failed: {result.get('error', 'Unknown error')}"
             }
-            mongo_client.add_connection_event(request.email, "github", event_data)
+            await mongo_client.add_connection_event(request.email, "github", event_data)
 
         return RepositoryResponse(
             success=result["success"],
@@ -169,7 +197,7 @@ async def process_repository(request: RepositoryRequest):
             "status": "failure",
             "message": f"Repository processing error: {str(e)}"
         }
-        mongo_client.add_connection_event(request.email, "github", event_data)
+        await mongo_client.add_connection_event(request.email, "github", event_data)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -180,7 +208,7 @@ async def generate_lesson(request: GenerateLessonRequest):
     """
     try:
         # Get username for the agent
-        username = mongo_client.get_username_by_email(request.email)
+        username = await mongo_client.get_username_by_email(request.email)
         if not username:
             raise HTTPException(status_code=404, detail="User not found")
 
@@ -193,7 +221,7 @@ async def generate_lesson(request: GenerateLessonRequest):
 
         # Save lesson to MongoDB
         lesson_dict = lesson.model_dump()
-        lesson_id = mongo_client.save_new_lesson(lesson_dict)
+        lesson_id = await mongo_client.save_new_lesson(lesson_dict)
 
         return GenerateLessonResponse(
             success=True, 
@@ -217,9 +245,9 @@ async def process_linear_tickets(request: LinearTicketRequest):
             "status": "in_progress",
             "message": "Starting Linear tickets sync"
         }
-        mongo_client.add_connection_event(request.email, "linear", event_data)
+        await mongo_client.add_connection_event(request.email, "linear", event_data)
         
-        runner = LinearTicketIngester(email=request.email)
+        runner = await LinearTicketIngester.from_email(request.email)
         result = await runner.ingest_tickets()
         
         # Update sync info and add completion event
@@ -228,26 +256,26 @@ async def process_linear_tickets(request: LinearTicketRequest):
                 "last_sync_status": "success",
                 "data_count": result.get("ticket_count", 0)
             }
-            mongo_client.update_connection_sync_info(request.email, "linear", sync_data)
+            await mongo_client.update_connection_sync_info(request.email, "linear", sync_data)
             
             event_data = {
                 "event_type": "sync",
                 "status": "success",
                 "message": f"Successfully synced {result.get('ticket_count', 0)} Linear tickets"
             }
-            mongo_client.add_connection_event(request.email, "linear", event_data)
+            await mongo_client.add_connection_event(request.email, "linear", event_data)
         else:
             sync_data = {
                 "last_sync_status": "failure"
             }
-            mongo_client.update_connection_sync_info(request.email, "linear", sync_data)
+            await mongo_client.update_connection_sync_info(request.email, "linear", sync_data)
             
             event_data = {
                 "event_type": "sync",
                 "status": "failure",
                 "message": f"Linear sync failed: {result.get('error', 'Unknown error')}"
             }
-            mongo_client.add_connection_event(request.email, "linear", event_data)
+            await mongo_client.add_connection_event(request.email, "linear", event_data)
         
         return RepositoryResponse(
             success=result["success"],
@@ -263,15 +291,15 @@ async def process_linear_tickets(request: LinearTicketRequest):
             "status": "failure",
             "message": f"Linear sync error: {str(e)}"
         }
-        mongo_client.add_connection_event(request.email, "linear", event_data)
+        await mongo_client.add_connection_event(request.email, "linear", event_data)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/set-linear-api-key", response_model=RepositoryResponse)
 async def set_linear_api_key(request: LinearTicketApiKeyRequest):
     try:
-        mongo_client.set_linear_api_key(email=request.email, api_key=request.api_key)
-        mongo_client.update_user_integrations(email=request.email, integration="linear", is_enabled=True)
+        await mongo_client.set_linear_api_key(email=request.email, api_key=request.api_key)
+        await mongo_client.update_user_integrations(email=request.email, integration="linear", is_enabled=True)
         
         # Update connection state
         connection_data = {
@@ -282,7 +310,7 @@ async def set_linear_api_key(request: LinearTicketApiKeyRequest):
             "is_connected": True,
             "connection_status": "connected"
         }
-        mongo_client.create_or_update_connection_state(connection_data)
+        await mongo_client.create_or_update_connection_state(connection_data)
         
         # Add connection event
         event_data = {
@@ -290,7 +318,7 @@ async def set_linear_api_key(request: LinearTicketApiKeyRequest):
             "status": "success",
             "message": "Linear API key configured successfully"
         }
-        mongo_client.add_connection_event(request.email, "linear", event_data)
+        await mongo_client.add_connection_event(request.email, "linear", event_data)
         
         return RepositoryResponse(
             success=True,
@@ -309,8 +337,8 @@ async def set_linear_api_key(request: LinearTicketApiKeyRequest):
 @app.post("/set-slack-api-key", response_model=RepositoryResponse)
 async def set_slack_api_key(request: SlackApiKeyRequest):
     try:
-        mongo_client.set_slack_api_key(email=request.email, api_key=request.api_key)
-        mongo_client.update_user_integrations(email=request.email, integration="slack", is_enabled=True)
+        await mongo_client.set_slack_api_key(email=request.email, api_key=request.api_key)
+        await mongo_client.update_user_integrations(email=request.email, integration="slack", is_enabled=True)
         
         # Update connection state
         connection_data = {
@@ -321,7 +349,7 @@ async def set_slack_api_key(request: SlackApiKeyRequest):
             "is_connected": True,
             "connection_status": "connected"
         }
-        mongo_client.create_or_update_connection_state(connection_data)
+        await mongo_client.create_or_update_connection_state(connection_data)
         
         # Add connection event
         event_data = {
@@ -329,7 +357,7 @@ async def set_slack_api_key(request: SlackApiKeyRequest):
             "status": "success",
             "message": "Slack API key configured successfully"
         }
-        mongo_client.add_connection_event(request.email, "slack", event_data)
+        await mongo_client.add_connection_event(request.email, "slack", event_data)
         
         return RepositoryResponse(success=True, repository=request.email, sandbox_id=None, output=None, error=None)
     except HTTPException:
@@ -342,7 +370,7 @@ async def set_slack_api_key(request: SlackApiKeyRequest):
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     try:
-        username = mongo_client.get_username_by_email(request.email)
+        username = await mongo_client.get_username_by_email(request.email)
         if not username:
             raise HTTPException(status_code=404, detail="User not found")
 
@@ -360,13 +388,42 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Same as /chat, but streams the answer as plain text while it is generated."""
+    username = await mongo_client.get_username_by_email(request.email)
+    if not username:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if request.reset or request.email not in chat_agent_registry:
+        chat_agent_registry[request.email] = ChatAgent(username)
+
+    chat_agent = chat_agent_registry[request.email]
+
+    async def answer_chunks():
+        try:
+            async for delta in chat_agent.stream(request.message):
+                yield delta
+        except Exception as e:
+            print(f"Error in chat stream for {request.email}: {e}")
+            yield f"\n\nI'm sorry, I encountered an error while processing your question: {str(e)}"
+
+    return StreamingResponse(answer_chunks(), media_type="text/plain; charset=utf-8")
+
+
+@app.get("/video/status/{job_id}")
+async def get_video_status(job_id: str):
+    """Poll a background video render started by the create_educational_video tool."""
+    return video_job_status(job_id)
+
+
 @app.get("/lessons/{email}", response_model=GetLessonsResponse)
 async def get_user_lessons(email: str):
     """
     Get all lesson summaries for a user with progress information.
     """
     try:
-        lesson_summaries = mongo_client.get_user_lesson_summaries_with_progress(email)
+        lesson_summaries = await mongo_client.get_user_lesson_summaries_with_progress(email)
         from app.models import LessonSummary
         
         # Convert to LessonSummary objects
@@ -384,7 +441,7 @@ async def get_lesson_by_id(email: str, lesson_id: str):
     Get a specific lesson by ID for a user.
     """
     try:
-        lesson_data = mongo_client.get_lesson_by_id(email, lesson_id)
+        lesson_data = await mongo_client.get_lesson_by_id(email, lesson_id)
         if not lesson_data:
             raise HTTPException(status_code=404, detail="Lesson not found")
         
@@ -405,7 +462,7 @@ async def delete_lesson(lesson_id: str):
     Delete a lesson by ID.
     """
     try:
-        success = mongo_client.delete_lesson(lesson_id)
+        success = await mongo_client.delete_lesson(lesson_id)
         
         if not success:
             raise HTTPException(status_code=404, detail="Lesson not found")
@@ -427,7 +484,7 @@ async def update_lesson_progress(request: UpdateProgressRequest):
         from datetime import datetime
         
         # Get the lesson to calculate completion percentage
-        lesson_data = mongo_client.get_lesson_by_id(request.email, request.lesson_id)
+        lesson_data = await mongo_client.get_lesson_by_id(request.email, request.lesson_id)
         if not lesson_data:
             raise HTTPException(status_code=404, detail="Lesson not found")
         
@@ -440,7 +497,7 @@ async def update_lesson_progress(request: UpdateProgressRequest):
         lesson_completed = False
         
         # Get existing progress to check if this is a new completion
-        existing_progress = mongo_client.get_lesson_progress(request.email, request.lesson_id)
+        existing_progress = await mongo_client.get_lesson_progress(request.email, request.lesson_id)
         if is_completed and (not existing_progress or not existing_progress.get("is_completed")):
             lesson_completed = True
         
@@ -456,7 +513,7 @@ async def update_lesson_progress(request: UpdateProgressRequest):
             "completed_at": datetime.utcnow() if is_completed and lesson_completed else existing_progress.get("completed_at") if existing_progress else None
         }
         
-        success = mongo_client.save_lesson_progress(progress_data)
+        success = await mongo_client.save_lesson_progress(progress_data)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to save progress")
         
@@ -481,7 +538,7 @@ async def get_lesson_progress(email: str, lesson_id: str):
     Get lesson progress for a specific user and lesson.
     """
     try:
-        progress_data = mongo_client.get_lesson_progress(email, lesson_id)
+        progress_data = await mongo_client.get_lesson_progress(email, lesson_id)
         
         if not progress_data:
             # Return empty progress if none exists
@@ -521,9 +578,9 @@ async def process_slack_messages(request: SlackIngestionRequest):
             "status": "in_progress",
             "message": f"Starting Slack messages sync for channel {request.channel_id}"
         }
-        mongo_client.add_connection_event(request.email, "slack", event_data)
+        await mongo_client.add_connection_event(request.email, "slack", event_data)
         
-        ingester = SlackMessageIngester(email=request.email)
+        ingester = await SlackMessageIngester.from_email(request.email)
         
         # Convert string timestamps to datetime objects if provided
         oldest = None
@@ -546,26 +603,26 @@ async def process_slack_messages(request: SlackIngestionRequest):
                 "last_sync_status": "success",
                 "data_count": result.get("message_count", 0)
             }
-            mongo_client.update_connection_sync_info(request.email, "slack", sync_data)
+            await mongo_client.update_connection_sync_info(request.email, "slack", sync_data)
             
             event_data = {
                 "event_type": "sync",
                 "status": "success",
                 "message": f"Successfully synced {result.get('message_count', 0)} Slack messages from channel {request.channel_id}"
             }
-            mongo_client.add_connection_event(request.email, "slack", event_data)
+            await mongo_client.add_connection_event(request.email, "slack", event_data)
         else:
             sync_data = {
                 "last_sync_status": "failure"
             }
-            mongo_client.update_connection_sync_info(request.email, "slack", sync_data)
+            await mongo_client.update_connection_sync_info(request.email, "slack", sync_data)
             
             event_data = {
                 "event_type": "sync",
                 "status": "failure",
                 "message": f"Slack sync failed: {result.get('error', 'Unknown error')}"
             }
-            mongo_client.add_connection_event(request.email, "slack", event_data)
+            await mongo_client.add_connection_event(request.email, "slack", event_data)
         
         return RepositoryResponse(
             success=result["success"],
@@ -581,7 +638,7 @@ async def process_slack_messages(request: SlackIngestionRequest):
             "status": "failure",
             "message": f"Slack sync error: {str(e)}"
         }
-        mongo_client.add_connection_event(request.email, "slack", event_data)
+        await mongo_client.add_connection_event(request.email, "slack", event_data)
         print(f"Error processing Slack messages for {request.email}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -592,7 +649,7 @@ async def get_user_profile(email: str):
     Get complete user profile including repositories and integrations.
     """
     try:
-        profile_data = mongo_client.get_user_profile(email)
+        profile_data = await mongo_client.get_user_profile(email)
         if not profile_data:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -623,7 +680,7 @@ async def add_repository(request: AddRepositoryRequest):
             "url": request.repository_url
         }
         
-        repository_id = mongo_client.add_repository(request.email, repository_data)
+        repository_id = await mongo_client.add_repository(request.email, repository_data)
         
         return RepositoryResponse(
             success=True,
@@ -643,7 +700,7 @@ async def remove_repository(request: RemoveRepositoryRequest):
     Remove a repository from user's repository list.
     """
     try:
-        success = mongo_client.remove_repository(request.email, request.repository_id)
+        success = await mongo_client.remove_repository(request.email, request.repository_id)
         
         if not success:
             raise HTTPException(status_code=404, detail="Repository not found")
@@ -669,12 +726,12 @@ async def interactive_slide_message(request: InteractiveSlideMessageRequest):
     """
     try:
         # Get username for the service
-        username = mongo_client.get_username_by_email(request.email)
+        username = await mongo_client.get_username_by_email(request.email)
         if not username:
             raise HTTPException(status_code=404, detail="User not found")
 
         # Get the lesson
-        lesson_data = mongo_client.get_lesson_by_id(request.email, request.lesson_id)
+        lesson_data = await mongo_client.get_lesson_by_id(request.email, request.lesson_id)
         if not lesson_data:
             raise HTTPException(status_code=404, detail="Lesson not found")
 
@@ -723,7 +780,7 @@ async def interactive_slide_message(request: InteractiveSlideMessageRequest):
 
         # Update the lesson in the database
         lesson_data["slides"][slide_index] = slide_data
-        mongo_client.update_lesson_slide(request.email, request.lesson_id, slide_index, slide_data)
+        await mongo_client.update_lesson_slide(request.email, request.lesson_id, slide_index, slide_data)
 
         return InteractiveSlideMessageResponse(
             success=True,
@@ -749,8 +806,8 @@ async def get_connection_states(email: str):
     Get all connection states for a user with summary statistics.
     """
     try:
-        connection_states_data = mongo_client.get_connection_states(email)
-        summary = mongo_client.get_connection_state_summary(email)
+        connection_states_data = await mongo_client.get_connection_states(email)
+        summary = await mongo_client.get_connection_state_summary(email)
         
         # Convert to DataSourceConnectionState objects
         connection_states = [DataSourceConnectionState(**state) for state in connection_states_data]
@@ -785,7 +842,7 @@ async def update_connection_state(request: ConnectionStateRequest):
         if request.config:
             connection_data["config"] = request.config
         
-        connection_id = mongo_client.create_or_update_connection_state(connection_data)
+        connection_id = await mongo_client.create_or_update_connection_state(connection_data)
         
         # Add event if specified
         if request.event_type:
@@ -794,10 +851,10 @@ async def update_connection_state(request: ConnectionStateRequest):
                 "status": "success",
                 "message": request.event_message or f"{request.event_type.title()} event"
             }
-            mongo_client.add_connection_event(request.email, request.source_type, event_data)
+            await mongo_client.add_connection_event(request.email, request.source_type, event_data)
         
         # Get updated connection state
-        updated_states = mongo_client.get_connection_states(request.email)
+        updated_states = await mongo_client.get_connection_states(request.email)
         updated_state = next((s for s in updated_states if s["id"] == connection_id), None)
         
         if updated_state:
@@ -829,12 +886,13 @@ async def test_connection(request: TestConnectionRequest):
             # Test Linear connection
             try:
                 from app.api_clients.linear_client import LinearClient
-                api_key = mongo_client.get_linear_api_key(request.email)
+                api_key = await mongo_client.get_linear_api_key(request.email)
                 if not api_key:
                     test_message = "Linear API key not configured"
                 else:
-                    client = LinearClient(api_key)
-                    team_ids = await client.get_team_ids()
+                    # A connection test must reach Linear, never a cached answer
+                    async with LinearClient(api_key, cache_ttl_s=0, stale_if_error=False) as client:
+                        team_ids = await client.get_team_ids()
                     if team_ids:
                         connection_healthy = True
                         test_message = f"Successfully connected to {len(team_ids)} team(s)"
@@ -847,7 +905,7 @@ async def test_connection(request: TestConnectionRequest):
             # Test Slack connection
             try:
                 from app.api_clients.slack_client import SlackClient
-                api_key = mongo_client.get_slack_api_key(request.email)
+                api_key = await mongo_client.get_slack_api_key(request.email)
                 if not api_key:
                     test_message = "Slack API key not configured"
                 else:
@@ -865,7 +923,7 @@ async def test_connection(request: TestConnectionRequest):
         elif request.source_type == "github":
             # Test GitHub connection (repository processing)
             try:
-                repositories = mongo_client.get_user_repositories(request.email)
+                repositories = await mongo_client.get_user_repositories(request.email)
                 if repositories:
                     connection_healthy = True
                     processed_count = len([r for r in repositories if r.get("is_processed", False)])
@@ -885,7 +943,7 @@ async def test_connection(request: TestConnectionRequest):
             "health_status": health_status,
             "error": None if connection_healthy else test_message
         }
-        mongo_client.update_connection_health(request.email, request.source_type, health_data)
+        await mongo_client.update_connection_health(request.email, request.source_type, health_data)
         
         # Add test event
         event_data = {
@@ -894,7 +952,7 @@ async def test_connection(request: TestConnectionRequest):
             "message": test_message,
             "metadata": {"response_time_ms": response_time_ms}
         }
-        mongo_client.add_connection_event(request.email, request.source_type, event_data)
+        await mongo_client.add_connection_event(request.email, request.source_type, event_data)
         
         return TestConnectionResponse(
             success=True,
@@ -47,7 +47,7 @@ class InteractiveLessonService:
             
             # Save session to MongoDB
             session_dict = session.model_dump()
-            mongo_client.save_interactive_lesson_session(session_dict)
+            await mongo_client.save_interactive_lesson_session(session_dict)
             
             print("✅ Interactive lesson session created successfully!")
             return session
@@ -350,10 +350,10 @@ class InteractiveLessonService:
         )
     
     
-    def get_session(self, session_id: str, user_email: str) -> Optional[InteractiveLessonSession]:
+    async def get_session(self, session_id: str, user_email: str) -> Optional[InteractiveLessonSession]:
         """Get an interactive lesson session by ID."""
         try:
-            session_data = mongo_client.get_interactive_lesson_session(session_id, user_email)
+            session_data = await mongo_client.get_interactive_lesson_session(session_id, user_email)
             if not session_data:
                 return None
             
@@ -362,11 +362,11 @@ class InteractiveLessonService:
             print(f"Error getting session: {e}")
             return None
     
-    def update_session(self, session: InteractiveLessonSession):
+    async def update_session(self, session: InteractiveLessonSession):
         """Update an interactive lesson session."""
         try:
             session_dict = session.model_dump()
-            mongo_client.update_interactive_lesson_session(session_dict)
+            await mongo_client.update_interactive_lesson_session(session_dict)
         except Exception as e:
             print(f"Error updating session: {e}")
             raise e
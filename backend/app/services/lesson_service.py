@@ -229,7 +229,7 @@ class LessonGeneratorService:
           * title: Clear, descriptive title focusing on architectural concepts (keep it short)
           * narration: 1-2 sentences explaining why this concept matters for developers shipping code (will be spoken aloud)
           * bullet_points: 2-3 SHORT key points focusing on practical implications (each point max 6-8 words, comma separated)
-        - The tool will generate a video and return a video_url - use this URL in your video slide
+        - The tool starts rendering in the background and returns a job_id - start both videos first, then call check_video_status with each job_id and use the returned video_url in your video slide
         - FOCUS ON ACTIONABLE INSIGHTS: "Error handling prevents production crashes", "Input validation blocks security issues", "Caching improves user experience"
         - Create 2 video slides per lesson focusing on the most critical concepts for developer productivity
         - Emphasize concepts that enable immediate code shipping capability
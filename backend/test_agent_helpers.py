@@ -0,0 +1,46 @@
+"""
+Unit tests for the shared HTTP client in app/agent/agent_helpers.py.
+Requests go through httpx.MockTransport, so nothing leaves the process.
+"""
+
+import asyncio
+
+import httpx
+
+from app.agent.agent_helpers import _PerLoopAsyncClient
+
+
+def make_client():
+    return _PerLoopAsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True})))
+
+
+def test_each_event_loop_gets_its_own_pool():
+    client = make_client()
+    pools = []
+
+    async def request():
+        response = await client.get("https://api.example/")
+        pools.append(client._loop_client())
+        return response.json()
+
+    # Two asyncio.run calls, as in the scripts: the second must not reuse the first loop's pool
+    assert asyncio.run(request()) == {"ok": True}
+    assert asyncio.run(request()) == {"ok": True}
+    assert pools[0] is not pools[1]
+
+
+def test_one_loop_reuses_its_pool_until_closed():
+    client = make_client()
+
+    async def scenario():
+        await client.get("https://api.example/")
+        first = client._loop_client()
+        await client.get("https://api.example/")
+        assert client._loop_client() is first
+
+        await client.aclose()
+        assert first.is_closed
+        await client.get("https://api.example/")
+        assert client._loop_client() is not first
+
+    asyncio.run(scenario())
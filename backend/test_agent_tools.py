@@ -0,0 +1,80 @@
+"""
+Unit tests for the per-run informational tool budget in app/agent/agent_tools.py.
+Retrieval is replaced with a stub, so no Pinecone or OpenAI access is needed.
+"""
+
+import asyncio
+import contextvars
+
+import pytest
+
+from app.agent import agent_tools
+from app.agent.agent_tools import BUDGET_EXHAUSTED_MESSAGE, create_search_tools, start_tool_budget
+
+
+@pytest.fixture
+def search(monkeypatch):
+    async def cached_retrieve(index_name, namespace, query, *args):
+        await asyncio.sleep(0)
+        return f"results for {query}"
+
+    monkeypatch.setattr(agent_tools, "_cached_retrieve", cached_retrieve)
+    search_codebase = create_search_tools("tester-user-database")[0]
+
+    async def call(query):
+        return str((await search_codebase.acall(query=query)).content)
+
+    return call
+
+
+def run_isolated(coro):
+    """Run like a request handler: in its own copy of the context."""
+    return contextvars.copy_context().run(asyncio.run, coro)
+
+
+def test_calls_outside_an_agent_run_are_not_limited(search):
+    async def calls():
+        return [await search(f"q{i}") for i in range(20)]
+
+    assert BUDGET_EXHAUSTED_MESSAGE not in run_isolated(calls())
+
+
+def test_run_is_cut_off_after_its_budget_including_calls_from_child_tasks(search):
+    async def run():
+        start_tool_budget(3)
+        first = await search("a")
+        # Tool calls happen on workflow tasks created by the run
+        rest = await asyncio.gather(*(asyncio.create_task(search(q)) for q in "bcd"))
+        return [first, *rest]
+
+    results = run_isolated(run())
+
+    assert results[:3] == ["results for a", "results for b", "results for c"]
+    assert results[3] == BUDGET_EXHAUSTED_MESSAGE
+
+
+def test_concurrent_runs_have_their_own_budgets(search):
+    async def run(name):
+        start_tool_budget(2)
+        return [await search(f"{name}{i}") for i in range(3)]
+
+    async def both():
+        return await asyncio.gather(asyncio.create_task(run("a")), asyncio.create_task(run("b")))
+
+    first, second = run_isolated(both())
+
+    assert first == ["results for a0", "results for a1", BUDGET_EXHAUSTED_MESSAGE]
+    assert second == ["results for b0", "results for b1", BUDGET_EXHAUSTED_MESSAGE]
+
+
+def test_each_query_starts_a_fresh_budget(search):
+    async def queries():
+        start_tool_budget(1)
+        first = [await search("a"), await search("b")]
+        start_tool_budget(1)
+        return first, await search("c")
+
+    first, second = run_isolated(queries())
+
+    assert first == ["results for a", BUDGET_EXHAUSTED_MESSAGE]
+    assert second == "results for c"
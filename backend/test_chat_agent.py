@@ -0,0 +1,139 @@
+"""
+Unit tests for ChatAgent's direct-search fast path: which prompts skip ReAct,
+and that everything else (or an empty search) falls back to the full agent.
+Collaborators are replaced with fakes, so no OpenAI or Pinecone access is needed.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.agent.chat_agent import ChatAgent
+
+
+class FakeSearchAll:
+    def __init__(self, content):
+        self.content = content
+        self.queries = []
+
+    async def acall(self, query):
+        self.queries.append(query)
+        return SimpleNamespace(content=self.content)
+
+
+class FakeLLM:
+    def __init__(self, reply="It lives in app/auth/middleware.py. Which route are you tracing?"):
+        self.reply = reply
+        self.calls = []
+
+    async def achat(self, messages):
+        self.calls.append(messages)
+        return SimpleNamespace(message=SimpleNamespace(content=self.reply))
+
+
+class FakeMemory:
+    def __init__(self):
+        self.messages = []
+
+    async def aput_messages(self, messages):
+        self.messages.extend(messages)
+
+
+class FakeReActAgent:
+    def __init__(self):
+        self.prompts = []
+
+    def run(self, prompt, ctx=None, memory=None):
+        self.prompts.append(prompt)
+
+        async def handler():
+            return "react answer"
+
+        return handler()
+
+
+def make_agent(search_content="1. app/auth/middleware.py (score 0.91)"):
+    agent = ChatAgent.__new__(ChatAgent)
+    agent.index_name = "tester-user-database"
+    agent._max_tool_calls = 10
+    agent._search_all = FakeSearchAll(search_content)
+    agent.llm = FakeLLM()
+    agent.memory = FakeMemory()
+    agent.agent = FakeReActAgent()
+    agent.ctx = None
+    return agent
+
+
+@pytest.mark.parametrize(
+    "prompt, query",
+    [
+        ("find the auth middleware", "the auth middleware"),
+        ("Search for retry config.", "retry config"),
+        ("search rate limiter", "rate limiter"),
+        ("show me the Linear client", "the Linear client"),
+        ("  locate slack ingestion!", "slack ingestion"),
+    ],
+)
+def test_lookup_commands_match(prompt, query):
+    match = ChatAgent.DIRECT_SEARCH_RE.match(prompt)
+    assert match is not None
+    assert match.group("query") == query
+
+
+@pytest.mark.parametrize(
+    "prompt",
+    [
+        "where is the retry logic failing and why?",
+        "where is the retry logic",
+        "find the bug?",
+        "find out why login is slow",
+        "show me how the cache works",
+        "search for what breaks the build",
+        "can you find the auth middleware",
+        "explain the auth middleware",
+        "find ab",
+        "find the auth middleware\nand then fix it",
+    ],
+)
+def test_questions_do_not_match(prompt):
+    assert ChatAgent.DIRECT_SEARCH_RE.match(prompt) is None
+
+
+def test_lookup_is_summarized_and_remembered():
+    agent = make_agent()
+
+    answer = asyncio.run(agent.query("find the auth middleware"))
+
+    assert answer == agent.llm.reply
+    assert agent._search_all.queries == ["the auth middleware"]
+    assert agent.agent.prompts == []
+    # The raw hits only go to the summarizing completion, under the chat persona
+    system, user = agent.llm.calls[0]
+    assert system.content == ChatAgent.SYSTEM_PROMPT
+    assert "app/auth/middleware.py" in user.content
+    assert [m.content for m in agent.memory.messages] == ["find the auth middleware", answer]
+
+
+def test_question_goes_to_react():
+    agent = make_agent()
+
+    answer = asyncio.run(agent.query("where is the retry logic failing and why?"))
+
+    assert answer == "react answer"
+    assert agent._search_all.queries == []
+    assert agent.llm.calls == []
+    assert agent.agent.prompts == ["where is the retry logic failing and why?"]
+
+
+@pytest.mark.parametrize("content", ["No results found for 'x'", "❌ Error searching all sources: boom"])
+def test_empty_or_failed_search_falls_back_to_react(content):
+    agent = make_agent(search_content=content)
+
+    answer = asyncio.run(agent.query("find the auth middleware"))
+
+    assert answer == "react answer"
+    assert agent._search_all.queries == ["the auth middleware"]
+    assert agent.llm.calls == []
+    assert agent.memory.messages == []
+    assert agent.agent.prompts == ["find the auth middleware"]
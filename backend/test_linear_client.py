@@ -0,0 +1,241 @@
+"""
+Unit tests for LinearClient's response cache, retry/backoff and per-key rate limiter.
+_send is replaced with a scripted fake and time/sleep are faked, so nothing touches
+api.linear.app or actually waits.
+"""
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+from app.api_clients import linear_client
+from app.api_clients.linear_client import LinearClient, _limiter_for, _TokenBucket
+
+QUERY = "query { teams { nodes { id } } }"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(linear_client, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(linear_client, "asyncio", SimpleNamespace(sleep=clock.sleep))
+    monkeypatch.setattr(linear_client, "_response_cache", OrderedDict())
+    monkeypatch.setattr(linear_client, "_limiters", {})
+    return clock
+
+
+class FakeSend:
+    """Replays scripted responses: (status, headers, data) tuples or exceptions."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.payloads = []
+
+    async def __call__(self, payload):
+        self.payloads.append(payload)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        status, headers, data = response
+        return status, headers, json.dumps(data).encode()
+
+
+def ok(data):
+    return 200, {}, {"data": data}
+
+
+def make_client(*responses, **kwargs):
+    client = LinearClient(api_key="test-key", **kwargs)
+    client._send = FakeSend(*responses)
+    return client
+
+
+def test_response_is_served_from_cache_until_ttl_expires(clock):
+    client = make_client(ok({"n": 1}), ok({"n": 2}), cache_ttl_s=60.0)
+
+    assert asyncio.run(client._make_request(QUERY)) == {"n": 1}
+    clock.now += 59.9
+    assert asyncio.run(client._make_request(QUERY)) == {"n": 1}
+    assert len(client._send.payloads) == 1
+
+    clock.now += 0.1
+    assert asyncio.run(client._make_request(QUERY)) == {"n": 2}
+    assert len(client._send.payloads) == 2
+
+
+def test_cache_key_includes_variables_but_not_their_order(clock):
+    client = make_client(ok({"team": "a"}), ok({"team": "b"}))
+
+    asyncio.run(client._make_request(QUERY, {"teamId": "a", "first": 50}))
+    asyncio.run(client._make_request(QUERY, {"first": 50, "teamId": "a"}))
+    asyncio.run(client._make_request(QUERY, {"teamId": "b", "first": 50}))
+
+    assert len(client._send.payloads) == 2
+
+
+def test_zero_ttl_never_caches(clock):
+    client = make_client(ok({"n": 1}), ok({"n": 2}), cache_ttl_s=0)
+
+    assert asyncio.run(client._make_request(QUERY)) == {"n": 1}
+    assert asyncio.run(client._make_request(QUERY)) == {"n": 2}
+    assert len(linear_client._response_cache) == 0
+
+
+def test_expired_response_is_served_when_linear_fails(clock):
+    client = make_client(ok({"n": 1}), (400, {}, {}), max_retries=0)
+    asyncio.run(client._make_request(QUERY))
+    clock.now += 120
+
+    assert asyncio.run(client._make_request(QUERY)) == {"n": 1}
+
+
+def test_failure_is_raised_without_stale_if_error(clock):
+    client = make_client(ok({"n": 1}), (400, {}, {}), max_retries=0, stale_if_error=False)
+    asyncio.run(client._make_request(QUERY))
+    clock.now += 120
+
+    with pytest.raises(Exception, match="failed: 400"):
+        asyncio.run(client._make_request(QUERY))
+
+
+def test_failure_is_raised_with_nothing_cached(clock):
+    client = make_client((400, {}, {}), max_retries=0)
+
+    with pytest.raises(Exception, match="failed: 400"):
+        asyncio.run(client._make_request(QUERY))
+
+
+def test_invalidate_drops_only_this_keys_entries(clock):
+    client = make_client(ok({"n": 1}), ok({"n": 2}))
+    other = LinearClient(api_key="other-key")
+    other._send = FakeSend(ok({"other": 1}))
+    asyncio.run(client._make_request(QUERY))
+    asyncio.run(other._make_request(QUERY))
+
+    client.invalidate()
+
+    assert asyncio.run(client._make_request(QUERY)) == {"n": 2}
+    assert asyncio.run(other._make_request(QUERY)) == {"other": 1}
+    assert len(other._send.payloads) == 1
+
+
+def test_rate_limits_and_gateway_errors_are_retried(clock, monkeypatch):
+    monkeypatch.setattr(linear_client, "random", SimpleNamespace(random=lambda: 0.0))
+    client = make_client(
+        (429, {"Retry-After": "2"}, {}),
+        (503, {}, {}),
+        aiohttp.ClientConnectionError("reset"),
+        ok({"n": 1}),
+        base_backoff=0.5,
+    )
+
+    assert asyncio.run(client._post(QUERY, None)) == {"n": 1}
+    assert len(client._send.payloads) == 4
+    # Retry-After wins over the exponential schedule; later attempts double
+    assert clock.sleeps == [2.0, 1.0, 2.0]
+
+
+def test_gives_up_after_max_retries(clock):
+    client = make_client(*[(503, {}, {})] * 3, max_retries=2)
+
+    with pytest.raises(Exception, match="failed: 503"):
+        asyncio.run(client._post(QUERY, None))
+    assert len(client._send.payloads) == 3
+
+
+def test_transient_error_is_raised_after_max_retries(clock):
+    client = make_client(*[aiohttp.ClientConnectionError("reset")] * 2, max_retries=1)
+
+    with pytest.raises(aiohttp.ClientConnectionError):
+        asyncio.run(client._post(QUERY, None))
+    assert len(client._send.payloads) == 2
+
+
+def test_client_errors_and_graphql_errors_are_not_retried(clock):
+    client = make_client((400, {}, {}))
+    with pytest.raises(Exception, match="failed: 400"):
+        asyncio.run(client._post(QUERY, None))
+
+    client = make_client((200, {}, {"errors": [{"message": "bad field"}]}))
+    with pytest.raises(Exception, match="bad field"):
+        asyncio.run(client._post(QUERY, None))
+    assert len(client._send.payloads) == 1
+
+
+def test_backoff_adds_bounded_jitter(clock, monkeypatch):
+    monkeypatch.setattr(linear_client, "random", SimpleNamespace(random=lambda: 1.0))
+    client = make_client(base_backoff=0.5)
+
+    assert client._backoff(0, None) == pytest.approx(0.75)
+    assert client._backoff(3, None) == pytest.approx(4.25)
+    assert client._backoff(3, "1") == pytest.approx(1.25)
+
+
+def test_token_bucket_allows_a_burst_then_paces_requests(clock):
+    bucket = _TokenBucket(rate=2.0)
+
+    async def acquire(n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    asyncio.run(acquire(2))
+    assert clock.sleeps == []
+
+    asyncio.run(acquire(2))
+    assert clock.sleeps == [pytest.approx(0.5), pytest.approx(0.5)]
+
+    # An idle bucket refills, but never beyond its capacity
+    clock.now += 60
+    clock.sleeps.clear()
+    asyncio.run(acquire(3))
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_limiter_is_shared_per_key_and_rate(clock):
+    first = LinearClient(api_key="test-key", requests_per_second=10)
+    second = LinearClient(api_key="test-key", requests_per_second=10)
+    slower = LinearClient(api_key="test-key", requests_per_second=1)
+
+    assert first._limiter is second._limiter
+    assert slower._limiter is not first._limiter
+    assert slower._limiter.rate == 1
+    assert _limiter_for("other-key", 10) is not first._limiter
+
+
+
+def test_cache_is_only_touched_under_its_lock(clock):
+    client = make_client(ok({"n": 1}))
+    done = threading.Event()
+
+    def request():
+        asyncio.run(client._make_request(QUERY))
+        done.set()
+
+    # Another thread (or event loop) holds the lock mid-update
+    with linear_client._response_cache_lock:
+        thread = threading.Thread(target=request)
+        thread.start()
+        assert not done.wait(0.1)
+    thread.join(5)
+
+    assert done.is_set()
+    with linear_client._response_cache_lock:
+        assert len(linear_client._response_cache) == 1
@@ -0,0 +1,305 @@
+"""
+Unit tests for MongoClient's startup indexes and lesson migration, and the login
+cache in verify_account. Collections and bcrypt are in-memory fakes implementing only the
+calls under test, so no cluster is needed and no real hash is computed.
+"""
+
+import asyncio
+import copy
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.api_clients import mongo
+from app.api_clients.mongo import MongoClient
+from app.models import LoginDetails
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakeUsers:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def find_one(self, filter, projection=None):
+        for doc in self.docs:
+            if doc["email"] == filter["email"]:
+                return {field: doc[field] for field in ("_id", *projection) if field in doc}
+        return None
+
+    def find(self, filter, projection=None):
+        assert filter == {"lessons": {"$exists": True}}
+        return FakeCursor([copy.deepcopy(doc) for doc in self.docs if "lessons" in doc])
+
+    async def update_one(self, filter, update):
+        for doc in self.docs:
+            if doc["_id"] == filter["_id"]:
+                doc.update(copy.deepcopy(update.get("$set", {})))
+                for field in update.get("$unset", ()):
+                    doc.pop(field, None)
+
+
+class FakeLessons:
+    """Applies UpdateOne($setOnInsert, upsert=True) the way the server would."""
+
+    def __init__(self, docs=(), fail_for=None, drop_writes=0):
+        self.docs = [dict(doc) for doc in docs]
+        self.fail_for = fail_for
+        # Operations silently reported as neither matched nor upserted
+        self.drop_writes = drop_writes
+
+    async def bulk_write(self, operations):
+        matched = upserted = 0
+        for op in operations:
+            if op.filter["user_email"] == self.fail_for:
+                raise ConnectionError("primary stepped down")
+            if self.drop_writes:
+                self.drop_writes -= 1
+            elif any(all(doc.get(k) == v for k, v in op.filter.items()) for doc in self.docs):
+                matched += 1
+            else:
+                self.docs.append(dict(op.update["$setOnInsert"]))
+                upserted += 1
+        return SimpleNamespace(matched_count=matched, upserted_count=upserted)
+
+
+@pytest.fixture(autouse=True)
+def plain_update_one(monkeypatch):
+    monkeypatch.setattr(
+        mongo,
+        "UpdateOne",
+        lambda filter, update, upsert=False: SimpleNamespace(filter=filter, update=update, upsert=upsert),
+    )
+
+
+def make_client(users, lessons):
+    client = MongoClient.__new__(MongoClient)
+    client.users = FakeUsers(users)
+    client.db = SimpleNamespace(lessons=lessons)
+    return client
+
+
+def embedded_users():
+    return [
+        {"_id": 1, "email": "a@x.com", "lessons": [{"id": "l1", "title": "One"}, {"id": "l2", "title": "Two"}]},
+        {"_id": 2, "email": "b@x.com", "lessons": [{"id": "l1", "title": "Other"}]},
+        {"_id": 3, "email": "c@x.com", "lessons": []},
+        {"_id": 4, "email": "d@x.com"},
+    ]
+
+
+def lesson_keys(lessons):
+    return sorted((doc["user_email"], doc["id"]) for doc in lessons.docs)
+
+
+def test_migration_moves_lessons_and_is_idempotent():
+    lessons = FakeLessons()
+    client = make_client(embedded_users(), lessons)
+
+    asyncio.run(client.migrate_embedded_lessons())
+    asyncio.run(client.migrate_embedded_lessons())
+
+    assert lesson_keys(lessons) == [("a@x.com", "l1"), ("a@x.com", "l2"), ("b@x.com", "l1")]
+    assert {"id": "l1", "title": "One", "user_email": "a@x.com"} in lessons.docs
+    assert all("lessons" not in user for user in client.users.docs)
+
+
+def test_lessons_already_copied_are_not_duplicated_or_overwritten():
+    # A previous run copied a@x.com's lessons, then stopped before removing the array
+    lessons = FakeLessons([{"id": "l1", "title": "Edited since", "user_email": "a@x.com"}])
+    client = make_client(embedded_users(), lessons)
+
+    asyncio.run(client.migrate_embedded_lessons())
+
+    assert lesson_keys(lessons) == [("a@x.com", "l1"), ("a@x.com", "l2"), ("b@x.com", "l1")]
+    assert lessons.docs[0]["title"] == "Edited since"
+
+
+def test_failed_migration_raises_and_a_rerun_resumes():
+    lessons = FakeLessons(fail_for="b@x.com")
+    client = make_client(embedded_users(), lessons)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(client.migrate_embedded_lessons())
+
+    # Only the user whose lessons were all written loses the embedded array
+    users = {user["email"]: user for user in client.users.docs}
+    assert "lessons" not in users["a@x.com"]
+    assert users["b@x.com"]["lessons"] == [{"id": "l1", "title": "Other"}]
+
+    lessons.fail_for = None
+    asyncio.run(client.migrate_embedded_lessons())
+
+    assert lesson_keys(lessons) == [("a@x.com", "l1"), ("a@x.com", "l2"), ("b@x.com", "l1")]
+    assert all("lessons" not in user for user in client.users.docs)
+
+
+def test_lessons_without_a_unique_id_get_one_and_are_all_kept():
+    users = [{"_id": 1, "email": "a@x.com", "lessons": [
+        {"title": "No id"},
+        {"id": "l1", "title": "First"},
+        {"id": "l1", "title": "Same id"},
+        {"id": None, "title": "Null id"},
+    ]}]
+    lessons = FakeLessons(fail_for="a@x.com")
+    client = make_client(users, lessons)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(client.migrate_embedded_lessons())
+    # The assigned ids were stored before any lesson was written
+    assigned = [lesson["id"] for lesson in client.users.docs[0]["lessons"]]
+    assert len(set(assigned)) == 4 and assigned[1] == "l1"
+
+    lessons.fail_for = None
+    asyncio.run(client.migrate_embedded_lessons())
+
+    assert sorted(doc["title"] for doc in lessons.docs) == ["First", "No id", "Null id", "Same id"]
+    assert sorted(doc["id"] for doc in lessons.docs) == sorted(assigned)
+    assert "lessons" not in client.users.docs[0]
+
+
+def test_array_is_kept_when_not_every_lesson_was_written():
+    lessons = FakeLessons(drop_writes=1)
+    client = make_client(embedded_users(), lessons)
+
+    with pytest.raises(RuntimeError, match="1 of 2 lessons for a@x.com"):
+        asyncio.run(client.migrate_embedded_lessons())
+    assert "lessons" in client.users.docs[0]
+
+    asyncio.run(client.migrate_embedded_lessons())
+
+    assert lesson_keys(lessons) == [("a@x.com", "l1"), ("a@x.com", "l2"), ("b@x.com", "l1")]
+
+
+class FakeIndexedCollection:
+    def __init__(self, name, fail_on_unique=False):
+        self.name = name
+        self.fail_on_unique = fail_on_unique
+        self.created = []
+
+    async def create_indexes(self, models):
+        if self.fail_on_unique and any(model.document.get("unique") for model in models):
+            raise DuplicateKeyError("E11000 duplicate key error")
+        self.created.extend(models)
+
+
+def make_indexed_client(failing):
+    names = ["lessons", "lesson_progress", "connection_states", "interactive_lessons"]
+    collections = {name: FakeIndexedCollection(name, name == failing) for name in ["users", *names]}
+    client = MongoClient.__new__(MongoClient)
+    client.users = collections["users"]
+    client.db = SimpleNamespace(**{name: collections[name] for name in names})
+    return client, collections
+
+
+@pytest.mark.parametrize("failing", ["users", "lessons"])
+def test_failing_to_build_a_required_unique_index_stops_startup(failing):
+    client, _ = make_indexed_client(failing)
+
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(client.ensure_indexes())
+
+
+def test_other_indexes_are_best_effort():
+    client, collections = make_indexed_client("lesson_progress")
+
+    asyncio.run(client.ensure_indexes())
+
+    assert collections["lesson_progress"].created == []
+    assert [model.document["key"] for model in collections["users"].created] == [
+        {"email": 1}, {"username": 1}, {"repositories.id": 1},
+    ]
+    assert collections["interactive_lessons"].created
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeBcrypt:
+    """Stands in for pwd_context: a "hash" is "hashed:<password>", and calls are counted."""
+
+    def __init__(self):
+        self.verify_calls = 0
+
+    def verify(self, password, stored_hash):
+        self.verify_calls += 1
+        return stored_hash == f"hashed:{password}"
+
+
+@pytest.fixture
+def login(monkeypatch):
+    clock = FakeClock()
+    bcrypt = FakeBcrypt()
+    monkeypatch.setattr(mongo, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(mongo, "pwd_context", bcrypt)
+    monkeypatch.setattr(mongo, "_verified_logins", mongo.OrderedDict())
+    client = make_client([{"_id": 1, "email": "a@x.com", "password": "hashed:hunter2"}], FakeLessons())
+
+    def verify(password):
+        return asyncio.run(client.verify_account(LoginDetails(email="a@x.com", password=password)))
+
+    return SimpleNamespace(clock=clock, bcrypt=bcrypt, users=client.users, verify=verify)
+
+
+def test_repeat_login_skips_bcrypt(login):
+    assert login.verify("hunter2")
+    assert login.verify("hunter2")
+
+    assert login.bcrypt.verify_calls == 1
+
+
+def test_wrong_password_always_pays_bcrypt(login):
+    assert login.verify("hunter2")
+
+    assert not login.verify("hunter3")
+    assert not login.verify("hunter3")
+
+    assert login.bcrypt.verify_calls == 3
+    assert len(mongo._verified_logins) == 1
+
+
+def test_password_change_invalidates_cached_login(login):
+    assert login.verify("hunter2")
+    login.users.docs[0]["password"] = "hashed:correct-horse"
+
+    assert not login.verify("hunter2")
+    assert login.verify("correct-horse")
+    assert login.bcrypt.verify_calls == 3
+
+
+def test_cached_login_expires_after_ttl(login):
+    assert login.verify("hunter2")
+
+    login.clock.now += mongo._VERIFY_CACHE_TTL_S - 1
+    assert login.verify("hunter2")
+    assert login.bcrypt.verify_calls == 1
+
+    login.clock.now += mongo._VERIFY_CACHE_TTL_S
+    assert login.verify("hunter2")
+    assert login.bcrypt.verify_calls == 2
+
+
+def test_cache_keys_are_digests_not_passwords(login):
+    assert login.verify("hunter2")
+
+    (key,) = mongo._verified_logins
+    assert isinstance(key, bytes) and len(key) == 32
+    assert b"hunter2" not in key and b"a@x.com" not in key
+    assert key == mongo._login_key("a@x.com", "hunter2", "hashed:hunter2")
+    assert key != mongo._login_key("a@x.com", "hunter3", "hashed:hunter2")
@@ -0,0 +1,157 @@
+"""
+Unit tests for the search tool caches in app/agent/query_cache.py.
+Time is driven by a fake monotonic clock, so TTL behaviour is checked without sleeping.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.agent import query_cache
+from app.agent.query_cache import (
+    QueryCache,
+    SemanticCache,
+    get_cache_stats,
+    get_search_cache,
+    normalize_query,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(query_cache, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = QueryCache(max_size=4, ttl_seconds=10.0)
+    cache.set("q", "result")
+
+    clock.now += 9.9
+    assert cache.get("q") == "result"
+
+    clock.now += 0.1
+    assert cache.get("q") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_evicts_least_recently_used(clock):
+    cache = QueryCache(max_size=2, ttl_seconds=60.0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_overwriting_a_key_refreshes_its_ttl(clock):
+    cache = QueryCache(max_size=2, ttl_seconds=10.0)
+    cache.set("q", "old")
+    clock.now += 8
+    cache.set("q", "new")
+    clock.now += 8
+
+    assert cache.get("q") == "new"
+
+
+def test_normalize_query_keys_whitespace_and_case_variants_together(clock):
+    cache = QueryCache()
+    cache.set(normalize_query("  Retry   Logic\n"), "hit")
+
+    assert normalize_query("retry logic") == "retry logic"
+    assert cache.get(normalize_query("RETRY\tlogic")) == "hit"
+    assert cache.get(normalize_query("retry logics")) is None
+
+
+def test_get_cache_stats_counts_hits_and_misses(clock, monkeypatch):
+    monkeypatch.setattr(query_cache, "_search_caches", {})
+    monkeypatch.setattr(query_cache, "semantic_cache", query_cache.SemanticCache())
+
+    cache = get_search_cache("codevectors")
+    assert get_search_cache("codevectors") is cache
+    cache.set("q", "result")
+    cache.get("q")
+    cache.get("q")
+    cache.get("missing")
+
+    stats = get_cache_stats()
+
+    assert set(stats) == {"exact", "semantic"}
+    codevectors = stats["exact"]["codevectors"]
+    assert codevectors["size"] == 1
+    assert codevectors["hits"] == 2
+    assert codevectors["misses"] == 1
+    assert codevectors["hit_rate"] == pytest.approx(2 / 3)
+    assert stats["semantic"]["hits"] == stats["semantic"]["misses"] == 0
+
+
+def test_semantic_hit_at_threshold_and_miss_just_below(clock):
+    cache = SemanticCache(max_size=4, ttl_seconds=60.0, threshold=0.6)
+    cache.set("ns", [1.0, 0.0], "cached")
+
+    # cosine([1, 0], [0.6, 0.8]) == 0.6, exactly the threshold
+    assert cache.get("ns", [0.6, 0.8]) == "cached"
+    assert cache.get("ns", [0.59, 0.81]) is None
+    # Vectors are normalized, so scale doesn't matter
+    assert cache.get("ns", [5.0, 0.0]) == "cached"
+    assert cache.get("other-ns", [1.0, 0.0]) is None
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_semantic_entry_expires_after_ttl(clock):
+    cache = SemanticCache(max_size=4, ttl_seconds=10.0, threshold=0.9)
+    cache.set("ns", [1.0, 0.0], "cached")
+
+    clock.now += 9.9
+    assert cache.get("ns", [1.0, 0.0]) == "cached"
+    clock.now += 0.1
+    assert cache.get("ns", [1.0, 0.0]) is None
+
+
+def test_full_buffer_wraps_around_over_least_recently_used(clock):
+    cache = SemanticCache(max_size=2, ttl_seconds=60.0, threshold=0.99)
+    cache.set("ns", [1.0, 0.0, 0.0], "a")
+    clock.now += 1
+    cache.set("ns", [0.0, 1.0, 0.0], "b")
+    clock.now += 1
+    assert cache.get("ns", [1.0, 0.0, 0.0]) == "a"
+    clock.now += 1
+
+    cache.set("ns", [0.0, 0.0, 1.0], "c")
+
+    assert cache.stats()["size"] == 2
+    assert cache.get("ns", [0.0, 1.0, 0.0]) is None
+    assert cache.get("ns", [1.0, 0.0, 0.0]) == "a"
+    assert cache.get("ns", [0.0, 0.0, 1.0]) == "c"
+
+
+def test_full_buffer_reuses_expired_slot_before_evicting_live_entry(clock):
+    cache = SemanticCache(max_size=2, ttl_seconds=10.0, threshold=0.99)
+    cache.set("ns", [1.0, 0.0, 0.0], "a")
+    clock.now += 8
+    cache.set("ns", [0.0, 1.0, 0.0], "b")
+    clock.now += 1
+    # "a" is now the most recently used entry, but it expires before "b"
+    assert cache.get("ns", [1.0, 0.0, 0.0]) == "a"
+    clock.now += 2
+
+    cache.set("ns", [0.0, 0.0, 1.0], "c")
+
+    assert cache.get("ns", [0.0, 1.0, 0.0]) == "b"
+    assert cache.get("ns", [0.0, 0.0, 1.0]) == "c"
+    assert cache.get("ns", [1.0, 0.0, 0.0]) is None
@@ -11,6 +11,7 @@ import json
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 
 from app.agent.agent_tools import create_simple_video_tool
+from app.agent.video.video_jobs import get_video_future, video_job_status
 
 def test_simple_video_tool():
     """Test the simple video generation tool."""
@@ -35,9 +36,15 @@ def test_simple_video_tool():
     print(f"   Bullet points: {test_bullets}")
     
     try:
-        # Call the tool function
+        # Call the tool function; it queues the render and returns a job id
         result_json = tool.fn(test_title, test_narration, test_bullets)
         result = json.loads(result_json)
+
+        if result.get('status') == 'pending':
+            print(f"\n⏳ Rendering job {result['job_id']}...")
+            future = get_video_future(result['job_id'])
+            future.exception()  # wait for render + upload without raising here
+            result = video_job_status(result['job_id'])
         
         print(f"\n📊 Result:")
         print(f"   Status: {result.get('status')}")
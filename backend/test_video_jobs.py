@@ -0,0 +1,153 @@
+"""
+Unit tests for the background video job queue in app/agent/video/video_jobs.py.
+Render and upload are replaced with stubs, so no manim, ffmpeg or Cloudinary is needed.
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.agent.video import video_jobs
+from app.agent.video.video_jobs import get_video_future, submit_video_job, video_job_status
+
+
+@pytest.fixture(autouse=True)
+def fresh_jobs(monkeypatch):
+    monkeypatch.setattr(video_jobs, "_jobs", {})
+
+
+class Stage:
+    """Stub render/upload step that records its calls and can be held open."""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, *args):
+        self.calls.append(args)
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def wait(job_id):
+    future = get_video_future(job_id)
+    try:
+        future.result(timeout=5)
+    except Exception:
+        pass
+    return video_job_status(job_id)
+
+
+def test_render_then_upload_goes_from_pending_to_success():
+    render = Stage(result={"local_path": "/tmp/video.mp4"})
+    render.release.clear()
+    upload = Stage(result={"cloudinary_link": "https://cdn/video.mp4", "local_path": None})
+
+    submit_video_job("job-1", "Title", render, "script", upload=upload)
+    assert video_job_status("job-1") == {"status": "pending", "job_id": "job-1", "title": "Title"}
+
+    render.release.set()
+    status = wait("job-1")
+
+    assert status["status"] == "success"
+    assert status["video_url"] == "https://cdn/video.mp4"
+    assert render.calls == [("script",)]
+    assert upload.calls == [("/tmp/video.mp4",)]
+
+
+def test_resubmitting_a_live_or_finished_job_is_a_no_op():
+    render = Stage(result={"local_path": "/tmp/video.mp4", "cloudinary_link": "https://cdn/v.mp4"})
+    render.release.clear()
+
+    submit_video_job("job-1", "Title", render)
+    first = get_video_future("job-1")
+    submit_video_job("job-1", "Title", render)
+    assert get_video_future("job-1") is first
+
+    render.release.set()
+    wait("job-1")
+    submit_video_job("job-1", "Title", render)
+
+    assert get_video_future("job-1") is first
+    assert len(render.calls) == 1
+
+
+def test_render_failure_is_reported_and_never_uploads():
+    render = Stage(error=RuntimeError("manim crashed"))
+    upload = Stage(result={"cloudinary_link": "https://cdn/video.mp4"})
+
+    submit_video_job("job-1", "Title", render, upload=upload)
+    status = wait("job-1")
+
+    assert status["status"] == "error"
+    assert "manim crashed" in status["error"]
+    assert upload.calls == []
+
+
+def test_render_without_output_skips_upload_and_can_be_retried():
+    render = Stage(result=None)
+    upload = Stage(result={"cloudinary_link": "https://cdn/video.mp4"})
+
+    submit_video_job("job-1", "Title", render, upload=upload)
+    assert wait("job-1")["status"] == "error"
+    assert upload.calls == []
+
+    # A failed job id is re-queued on the next submit
+    render.result = {"local_path": "/tmp/video.mp4"}
+    submit_video_job("job-1", "Title", render, upload=upload)
+
+    assert wait("job-1")["status"] == "success"
+    assert len(render.calls) == 2
+    assert len(upload.calls) == 1
+
+
+def test_failure_is_logged_once_however_often_it_is_polled(caplog):
+    render = Stage(error=RuntimeError("manim crashed"))
+
+    def failures():
+        return [record for record in caplog.records if "job-1 failed" in record.getMessage()]
+
+    with caplog.at_level("ERROR", logger=video_jobs.__name__):
+        submit_video_job("job-1", "Title", render)
+        wait("job-1")
+        # Done-callbacks can still be running on the worker when result() returns
+        deadline = time.monotonic() + 5
+        while not failures() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        for _ in range(3):
+            assert video_job_status("job-1")["status"] == "error"
+
+    assert len(failures()) == 1
+    assert failures()[0].exc_info[1] is render.error
+
+
+def test_upload_failure_is_reported():
+    render = Stage(result={"local_path": "/tmp/video.mp4"})
+    upload = Stage(error=ConnectionError("cloudinary down"))
+
+    submit_video_job("job-1", "Title", render, upload=upload)
+    status = wait("job-1")
+
+    assert status["status"] == "error"
+    assert "cloudinary down" in status["error"]
+
+
+def test_upload_without_link_is_partial_success():
+    render = Stage(result={"local_path": "/tmp/video.mp4"})
+    upload = Stage(result={"local_path": "/tmp/video.mp4"})
+
+    submit_video_job("job-1", "Title", render, upload=upload)
+    status = wait("job-1")
+
+    assert status["status"] == "partial_success"
+    assert status["local_path"] == "/tmp/video.mp4"
+
+
+def test_unknown_job_is_an_error():
+    assert video_job_status("missing")["status"] == "error"